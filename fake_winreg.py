@@ -0,0 +1,340 @@
+"""
+In-memory stand-in for the 'winreg' module.
+
+Anything taking a 'backend' argument calls the 'winreg' functions on it,
+e.g. 'backend.OpenKey()', so either the real 'winreg' module or a
+'FakeWinReg()' can be passed. The fake lets those parts be driven, and
+tested, on any platform.
+
+Only the reading side of 'winreg' is provided. The registry contents are
+set up, or changed, with the 'create_key()', 'set_value()', 'delete_key()'
+and 'delete_value()' methods, which also fire change notifications to any
+'notifier()' watching the changed key.
+
+Each 'winreg' function can also be made to take a synthetic latency, to
+stand in for a busy registry, see 'FakeWinReg.latency'.
+
+The WOW64 32-bit view is modelled by redirecting the keys in
+'FakeWinReg.redirected' to their 'Wow6432Node' subkey, other than the
+subkeys in 'FakeWinReg.shared'. Symbolic links are made with
+'create_link()', and followed unless opened with 'REG_OPTION_OPEN_LINK'.
+'FakeWinReg.key_identity()' stands in for the kernel's name of a key,
+see 'winreg_views.key_identity()'.
+"""
+
+import itertools
+import queue
+import time
+
+# Same values as the 'winreg.HKEY_*' constants on 64-bit Windows
+HKEY_CLASSES_ROOT = 18446744071562067968
+HKEY_CURRENT_USER = 18446744071562067969
+HKEY_LOCAL_MACHINE = 18446744071562067970
+HKEY_USERS = 18446744071562067971
+HKEY_CURRENT_CONFIG = 18446744071562067973
+
+KEY_READ = 131097
+KEY_NOTIFY = 16
+KEY_WOW64_64KEY = 0x0100
+KEY_WOW64_32KEY = 0x0200
+
+REG_OPTION_OPEN_LINK = 0x0008
+
+REG_NONE = 0
+REG_SZ = 1
+REG_EXPAND_SZ = 2
+REG_BINARY = 3
+REG_DWORD = 4
+REG_LINK = 6
+REG_MULTI_SZ = 7
+REG_QWORD = 11
+
+ERROR_NO_MORE_ITEMS = 259
+ERROR_CANT_RESOLVE_FILENAME = 1921
+
+WOW6432NODE = "Wow6432Node"
+MAX_LINK_HOPS = 16  # Links to links followed before giving up
+
+
+class _FakeKey:
+    """A key: its own name, subkeys and values, all looked up case-insensitively."""
+
+    def __init__(self, name, identity):
+        self.name = name
+        self.identity = identity  # (hkey, casefold key-path) it was created at
+        self.subkeys = {}  # casefold name: _FakeKey
+        self.values = {}  # casefold name: (name, value, type)
+        self.last_write = 0
+        self.link = None  # (hkey, key-path) if a symbolic link
+
+
+class FakeHKEY:
+    """Open key handle, as returned by 'FakeWinReg.OpenKey()'."""
+
+    def __init__(self, hkey, path, node, access=KEY_READ):
+        self.hkey = hkey
+        self.path = path
+        self.node = node
+        self.access = access
+        self.closed = False
+
+    def Close(self):  # noqa: N802 - Same name as winreg's PyHKEY
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.Close()
+        return False
+
+
+class FakeNotifier:
+    """
+    Change notification source for a 'FakeWinReg'.
+
+    'wait()' returns the set of changed key-paths, under the watched paths,
+    that were queued since the last call. An empty set means it timed out.
+    """
+
+    def __init__(self, fake, hkey, paths):
+        self._fake = fake
+        self.hkey = hkey
+        self.paths = [path.casefold() for path in paths]
+        self._queue = queue.Queue()
+
+    def _fire(self, hkey, path):
+        folded = path.casefold()
+        if hkey == self.hkey and any(
+            not watched or folded == watched or folded.startswith(f"{watched}\\")
+            for watched in self.paths
+        ):
+            self._queue.put(path)
+
+    def wait(self, timeout=None):
+        try:
+            changed = {self._queue.get(timeout=timeout)}
+        except queue.Empty:
+            return set()
+        while not self._queue.empty():  # Hand back everything already queued
+            changed.add(self._queue.get_nowait())
+        return changed
+
+    def close(self):
+        if self in self._fake.notifiers:
+            self._fake.notifiers.remove(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+class FakeWinReg:
+    """
+    The 'winreg' functions, reading from an in-memory registry.
+
+    latency is the seconds each 'winreg' function takes, or a function
+    returning them, passed to sleep (e.g. a fake clock's) before each call.
+    """
+
+    HKEY_CLASSES_ROOT = HKEY_CLASSES_ROOT
+    HKEY_CURRENT_USER = HKEY_CURRENT_USER
+    HKEY_LOCAL_MACHINE = HKEY_LOCAL_MACHINE
+    HKEY_USERS = HKEY_USERS
+    HKEY_CURRENT_CONFIG = HKEY_CURRENT_CONFIG
+    KEY_READ = KEY_READ
+    KEY_NOTIFY = KEY_NOTIFY
+    KEY_WOW64_64KEY = KEY_WOW64_64KEY
+    KEY_WOW64_32KEY = KEY_WOW64_32KEY
+    REG_OPTION_OPEN_LINK = REG_OPTION_OPEN_LINK
+
+    def __init__(self, latency=None, sleep=time.sleep):
+        self.latency = latency
+        self.sleep = sleep
+        self.hives = {
+            hkey: _FakeKey("", (hkey, ""))
+            for hkey in (
+                HKEY_CLASSES_ROOT,
+                HKEY_CURRENT_USER,
+                HKEY_LOCAL_MACHINE,
+                HKEY_USERS,
+                HKEY_CURRENT_CONFIG,
+            )
+        }
+        # Keys the 32-bit view redirects to their Wow6432Node subkey, and their
+        # subkeys that are shared by both views, as {(hkey, casefold key-path)}
+        self.redirected = {(HKEY_LOCAL_MACHINE, "software")}
+        self.shared = set()
+        self.notifiers = []
+        self._clock = itertools.count(1)  # Stands in for the last write FILETIME
+
+    # ######################################
+    # Internal helpers
+
+    @staticmethod
+    def _split(path):
+        return [segment for segment in path.split("\\") if segment]
+
+    @staticmethod
+    def _subkey(node, name):
+        try:
+            return node.subkeys[name.casefold()]
+        except KeyError:
+            raise FileNotFoundError(  # noqa: TRY003
+                2, "The system cannot find the file specified"
+            ) from None
+
+    def _redirect(self, hkey, segments):
+        """Return the index to insert Wow6432Node at in the 32-bit view, or None."""
+        for index in range(len(segments)):
+            path = "\\".join(segments[: index + 1]).casefold()
+            if (hkey, path) in self.redirected:
+                if index + 1 < len(segments):
+                    shared = f"{path}\\{segments[index + 1].casefold()}"
+                    if (hkey, shared) in self.shared:
+                        return None
+                return index + 1
+        return None
+
+    def _follow(self, node):
+        """Return the key the node links to, or the node if it is not a link."""
+        for _ in range(MAX_LINK_HOPS):
+            if node.link is None:
+                return node
+            hkey, path = node.link
+            node = self._resolve(hkey, path, REG_OPTION_OPEN_LINK)[2]
+        raise OSError(ERROR_CANT_RESOLVE_FILENAME, "The name cannot be resolved")
+
+    def _resolve(self, key, sub_key, reserved=0, access=KEY_READ):
+        """
+        Return (hkey, path, node, access) for a root HKEY or open handle plus a sub-key.
+
+        The path is as given, but with each key's own casing. Links are followed,
+        other than a last one opened with REG_OPTION_OPEN_LINK, and in the 32-bit
+        view the redirected keys are swapped for their Wow6432Node subkey.
+        """
+        if isinstance(key, FakeHKEY):
+            hkey, segments = key.hkey, self._split(key.path)
+            access |= key.access & (KEY_WOW64_64KEY | KEY_WOW64_32KEY)
+        else:
+            hkey, segments = key, []
+        segments += self._split(sub_key or "")
+
+        redirect = None
+        if access & KEY_WOW64_32KEY:
+            redirect = self._redirect(hkey, segments)
+
+        node, names = self.hives[hkey], []
+        for index, segment in enumerate(segments):
+            if index == redirect:
+                node = self._follow(self._subkey(node, WOW6432NODE))
+            node = self._subkey(node, segment)
+            names.append(node.name)
+            if index < len(segments) - 1 or not reserved & REG_OPTION_OPEN_LINK:
+                node = self._follow(node)
+        if redirect == len(segments):
+            node = self._follow(self._subkey(node, WOW6432NODE))
+        return hkey, "\\".join(names), node, access
+
+    def _delay(self):
+        if self.latency:
+            self.sleep(self.latency() if callable(self.latency) else self.latency)
+
+    def _changed(self, hkey, path, node):
+        node.last_write = next(self._clock)
+        for notifier in list(self.notifiers):
+            notifier._fire(hkey, path)
+
+    # ######################################
+    # winreg functions
+
+    def OpenKey(self, key, sub_key, reserved=0, access=KEY_READ):  # noqa: N802
+        self._delay()
+        return FakeHKEY(*self._resolve(key, sub_key, reserved, access))
+
+    OpenKeyEx = OpenKey
+
+    def CloseKey(self, hkey):  # noqa: N802
+        hkey.Close()
+
+    def EnumKey(self, key, index):  # noqa: N802
+        self._delay()
+        try:
+            return list(key.node.subkeys.values())[index].name
+        except IndexError:
+            raise OSError(ERROR_NO_MORE_ITEMS, "No more data is available") from None
+
+    def EnumValue(self, key, index):  # noqa: N802
+        self._delay()
+        try:
+            return list(key.node.values.values())[index]
+        except IndexError:
+            raise OSError(ERROR_NO_MORE_ITEMS, "No more data is available") from None
+
+    def QueryInfoKey(self, key):  # noqa: N802
+        self._delay()
+        return len(key.node.subkeys), len(key.node.values), key.node.last_write
+
+    def QueryValueEx(self, key, name):  # noqa: N802
+        self._delay()
+        try:
+            _, value, type = key.node.values[(name or "").casefold()]
+        except KeyError:
+            raise FileNotFoundError(  # noqa: TRY003
+                2, "The system cannot find the file specified"
+            ) from None
+        return value, type
+
+    def key_identity(self, key):
+        """The same for a key whichever way it was opened, e.g. through a link."""
+        return key.node.identity
+
+    # ######################################
+    # Setting up and changing the registry contents
+
+    def create_key(self, hkey, path):
+        """Create the key-path, and any missing parents, returning its node."""
+        node, this_path = self.hives[hkey], ""
+        for segment in self._split(path):
+            parent_path = this_path
+            this_path = f"{this_path}\\{segment}" if this_path else segment
+            if segment.casefold() not in node.subkeys:
+                identity = (hkey, this_path.casefold())
+                node.subkeys[segment.casefold()] = _FakeKey(segment, identity)
+                self._changed(hkey, parent_path, node)
+            node = node.subkeys[segment.casefold()]
+        return node
+
+    def create_link(self, hkey, path, target_hkey, target_path):
+        """Create the key-path as a symbolic link to the target key-path."""
+        node = self.create_key(hkey, path)
+        node.link = (target_hkey, target_path)
+        name = "SymbolicLinkValue"
+        node.values[name.casefold()] = (name, target_path, REG_LINK)
+        return node
+
+    def set_value(self, hkey, path, name, value, type=REG_SZ):
+        node = self.create_key(hkey, path)
+        node.values[name.casefold()] = (name, value, type)
+        self._changed(hkey, self._resolve(hkey, path)[1], node)
+
+    def delete_value(self, hkey, path, name):
+        _, path, node, _ = self._resolve(hkey, path)
+        del node.values[name.casefold()]
+        self._changed(hkey, path, node)
+
+    def delete_key(self, hkey, path):
+        """Delete the key and everything under it."""
+        *parent, name = self._split(path)
+        _, parent_path, parent_node, _ = self._resolve(hkey, "\\".join(parent))
+        del parent_node.subkeys[name.casefold()]
+        self._changed(hkey, parent_path, parent_node)
+
+    def notifier(self, hkey, paths):
+        """Return a 'FakeNotifier' for changes to the key-paths' subtrees."""
+        notifier = FakeNotifier(self, hkey, paths)
+        self.notifiers.append(notifier)
+        return notifier
@@ -1,3 +1,5 @@
+import contextlib
+import sys
 import winreg
 from unittest.mock import MagicMock, call, patch
 
@@ -96,13 +98,13 @@ def test_get_values_permission_error():
 
 
 def test_get_winreg_values_simple(monkeypatch):
-    def fake_get_keys(h, p):
+    def fake_get_keys(h, p, backend=None):
         if p == "Software\\Test":
             return iter(["Subkey"])
         else:
             return iter([])
 
-    def fake_get_values(h, p):
+    def fake_get_values(h, p, backend=None):
         if p.endswith("Subkey"):
             return iter([("name2", "val2", "type2")])
         else:
@@ -133,7 +135,7 @@ def test_get_winreg_values_simple(monkeypatch):
 
 
 def test_get_winreg_values_recursion(monkeypatch):
-    def fake_get_keys(h, p):
+    def fake_get_keys(h, p, backend=None):
         if p == "Root":
             return iter(["Sub1"])
         elif p == "Root\\Sub1":
@@ -141,7 +143,7 @@ def test_get_winreg_values_recursion(monkeypatch):
         else:
             return iter([])
 
-    def fake_get_values(h, p):
+    def fake_get_values(h, p, backend=None):
         return iter([(p, "value", 1)])
 
     monkeypatch.setattr(winreg_read, "get_keys", fake_get_keys)
@@ -166,3 +168,368 @@ def test_get_winreg_values_recursion(monkeypatch):
         ]
 
         mock_print.assert_has_calls(expected, any_order=False)
+
+
+def _fake_tree(monkeypatch, interrupt_at=None):
+    # Root -> A -> A1, Root -> B, with each key having one value
+    tree = {"Root": ["A", "B"], "Root\\A": ["A1"]}
+
+    def fake_get_keys(h, p, backend=None):
+        return iter(tree.get(p, []))
+
+    def fake_get_values(h, p, backend=None):
+        if p == interrupt_at:
+            raise KeyboardInterrupt
+        return iter([("name", p, 1)])
+
+    monkeypatch.setattr(winreg_read, "get_keys", fake_get_keys)
+    monkeypatch.setattr(winreg_read, "get_values", fake_get_values)
+
+
+def test_traverse_checkpoint_removed_when_complete(monkeypatch, tmp_path):
+    _fake_tree(monkeypatch)
+    checkpoint = tmp_path / "walk.json"
+
+    with patch("builtins.print"):
+        winreg_read.traverse_winreg_for_values(
+            winreg.HKEY_CURRENT_USER,
+            "Root",
+            [],
+            checkpoint_file=str(checkpoint),
+            checkpoint_interval=1,
+        )
+
+    assert not checkpoint.exists()
+
+
+def test_traverse_checkpoint_synced(monkeypatch, tmp_path):
+    _fake_tree(monkeypatch)
+    checkpoint = tmp_path / "walk.json"
+    output = tmp_path / "walk.txt"
+    synced = []
+    monkeypatch.setattr(winreg_read.os, "fsync", synced.append)
+
+    with open(output, "w", encoding="utf-8") as fid, contextlib.redirect_stdout(fid):
+        winreg_read.traverse_winreg_for_values(
+            winreg.HKEY_CURRENT_USER,
+            "Root",
+            [],
+            checkpoint_file=str(checkpoint),
+            checkpoint_interval=2,
+        )
+        output_fileno = fid.fileno()
+
+    # Checkpoints after 2 and 4 keys, each syncing the output then the checkpoint
+    assert len(synced) == 4
+    assert synced[0::2] == [output_fileno, output_fileno]
+    assert output_fileno not in synced[1::2]
+
+
+def test_traverse_resume_from_checkpoint(monkeypatch, tmp_path):
+    checkpoint = str(tmp_path / "walk.json")
+    output = tmp_path / "walk.txt"
+    expected = tmp_path / "expected.txt"
+
+    _fake_tree(monkeypatch)
+    with open(expected, "w", encoding="utf-8") as fid, contextlib.redirect_stdout(fid):
+        winreg_read.traverse_winreg_for_values(winreg.HKEY_CURRENT_USER, "Root", [])
+
+    # Interrupt on the last key, after checkpoints were saved for the others
+    _fake_tree(monkeypatch, interrupt_at="Root\\B")
+    with (
+        open(output, "w", encoding="utf-8") as fid,
+        contextlib.redirect_stdout(fid),
+        pytest.raises(KeyboardInterrupt),
+    ):
+        winreg_read.traverse_winreg_for_values(
+            winreg.HKEY_CURRENT_USER,
+            "Root",
+            [],
+            checkpoint_file=checkpoint,
+            checkpoint_interval=2,
+        )
+
+    resume = winreg_read.load_checkpoint(checkpoint)
+    assert resume["hkey"] == "HKEY_CURRENT_USER"
+    assert resume["output"] == str(output)
+    assert resume["keys"] == 2
+    assert [p for p, *_ in resume["pending"]] == ["Root\\B", "Root\\A\\A1"]
+
+    # Resume the same way walk_winreg() does, dropping output after the checkpoint
+    _fake_tree(monkeypatch)
+    with open(output, "r+", encoding="utf-8") as fid:
+        fid.seek(resume["output_offset"])
+        fid.truncate()
+        with contextlib.redirect_stdout(fid):
+            winreg_read.traverse_winreg_for_values(
+                resume["hkey"],
+                resume["path"],
+                resume["exclude"],
+                checkpoint_file=checkpoint,
+                resume=resume,
+            )
+
+    assert output.read_text(encoding="utf-8") == expected.read_text(encoding="utf-8")
+
+
+def test_traverse_key_path_casing(monkeypatch):
+    # The key-path is printed as passed, and subkeys as EnumKey returns them,
+    # e.g. not 'Subone' or 'Sub1\\A.B.C' from .title()
+    tree = {"root": ["SubOne"], "root\\subone": ["a.B.c"], "root\\subone\\a.b.c": ["x"]}
+
+    def fake_get_keys(h, p, backend=None):
+        return iter(tree.get(p.lower(), []))
+
+    monkeypatch.setattr(winreg_read, "get_keys", fake_get_keys)
+    monkeypatch.setattr(winreg_read, "get_values", lambda h, p, backend=None: iter([]))
+
+    with patch("builtins.print") as mock_print:
+        winreg_read.traverse_winreg_for_values(winreg.HKEY_CURRENT_USER, "root", [])
+
+        assert mock_print.call_args_list == [
+            call("\nComputer\\HKEY_CURRENT_USER\\root"),
+            call("\nComputer\\HKEY_CURRENT_USER\\root\\SubOne"),
+            call("\nComputer\\HKEY_CURRENT_USER\\root\\SubOne\\a.B.c"),
+            call("\nComputer\\HKEY_CURRENT_USER\\root\\SubOne\\a.B.c\\x"),
+        ]
+
+
+def test_traverse_excluded_keys(monkeypatch):
+    _fake_tree(monkeypatch)
+
+    with patch("builtins.print") as mock_print:
+        winreg_read.traverse_winreg_for_values(
+            winreg.HKEY_CURRENT_USER, "Root", ["root\\a", "Other\\B"]
+        )
+
+        assert [c for c in mock_print.call_args_list if len(c.args) == 1] == [
+            call("\nComputer\\HKEY_CURRENT_USER\\Root"),
+            call("\nUser Excluded: key-path=Root\\A"),
+            call("\nComputer\\HKEY_CURRENT_USER\\Root\\B"),
+        ]
+
+
+def test_print_progress_after_resume(capsys):
+    # Resumed at 100 keys & 50% done, 10 seconds ago
+    with patch("time.monotonic", return_value=110.0):
+        winreg_read._print_progress(200, 100.0, 0.75, 100, 0.5)
+
+    # 100 keys in 10 secs, and 25% in 10 secs leaves 25% taking another 10 secs
+    assert capsys.readouterr().err == (
+        "\r200 keys, 10.0 keys/sec, 75.0% done, ETA 0:00:10  "
+    )
+
+
+def test_traverse_progress_to_stderr(monkeypatch, capsys):
+    _fake_tree(monkeypatch)
+    winreg_read.traverse_winreg_for_values(
+        winreg.HKEY_CURRENT_USER, "Root", [], progress=True
+    )
+
+    captured = capsys.readouterr()
+    assert "keys/sec" not in captured.out
+    assert captured.err.startswith("\r4 keys, ")
+    assert "100.0% done" in captured.err
+
+
+def test_print_winreg_query():
+    from winreg_read import fake_winreg
+
+    fake = fake_winreg.FakeWinReg()
+    fake.set_value(winreg.HKEY_CURRENT_USER, "Software\\Python\\A", "", "a")
+    fake.set_value(winreg.HKEY_CURRENT_USER, "Software\\Python\\B", "Name", "b")
+
+    with patch("builtins.print") as mock_print:
+        winreg_read.print_winreg_query(
+            winreg.HKEY_CURRENT_USER, "Software\\Python\\*", backend=fake
+        )
+
+        assert mock_print.call_args_list == [
+            call("\nComputer\\HKEY_CURRENT_USER\\Software\\Python\\A"),
+            call("\tREG_SZ           ", "(Default)               ", "a"),
+            call("\nComputer\\HKEY_CURRENT_USER\\Software\\Python\\B"),
+            call("\tREG_SZ           ", "Name                    ", "b"),
+        ]
+
+
+def test_walk_winreg_records():
+    from winreg_read import fake_winreg
+
+    fake = fake_winreg.FakeWinReg()
+    fake.set_value(winreg.HKEY_CURRENT_USER, "Root\\A\\A1", "Name", "a1")
+    fake.set_value(winreg.HKEY_CURRENT_USER, "Root\\B", "Name", "b")
+    fake.create_key(winreg.HKEY_CURRENT_USER, "Root\\Skip\\Me")
+
+    records = list(
+        winreg_read.walk_winreg_records(
+            winreg.HKEY_CURRENT_USER, "Root", ["root\\skip"], backend=fake
+        )
+    )
+
+    assert [(record.path, record.values) for record in records] == [
+        ("HKEY_CURRENT_USER\\Root", []),
+        ("HKEY_CURRENT_USER\\Root\\A", []),
+        ("HKEY_CURRENT_USER\\Root\\A\\A1", [("Name", "a1", 1)]),
+        ("HKEY_CURRENT_USER\\Root\\B", [("Name", "b", 1)]),
+    ]
+
+
+def test_print_winreg_du():
+    from winreg_read import fake_winreg
+
+    fake = fake_winreg.FakeWinReg()
+    fake.set_value(winreg.HKEY_CURRENT_USER, "Root\\A\\A1", "Name", "a1")
+    fake.set_value(winreg.HKEY_CURRENT_USER, "Root\\B", "Name", "big value")
+
+    with patch("builtins.print") as mock_print:
+        winreg_read.print_winreg_du(
+            winreg.HKEY_CURRENT_USER, "Root", [], depth=1, backend=fake
+        )
+
+        assert mock_print.call_args_list[1:] == [
+            call(f"{1:>12,} {1:>12,} {20:>16,}  Computer\\HKEY_CURRENT_USER\\Root\\B"),
+            call(f"{2:>12,} {1:>12,} {6:>16,}  Computer\\HKEY_CURRENT_USER\\Root\\A"),
+            call(f"{4:>12,} {2:>12,} {26:>16,}  Total"),
+        ]
+
+
+def _fake_views():
+    from winreg_read import fake_winreg
+
+    hklm = winreg.HKEY_LOCAL_MACHINE
+    fake = fake_winreg.FakeWinReg()
+    fake.set_value(hklm, "Software\\App64", "Bits", 64)
+    fake.set_value(hklm, "Software\\Wow6432Node\\App32", "Bits", 32)
+    fake.set_value(hklm, "Software\\Shared", "Bits", 0)
+    fake.create_link(hklm, "Software\\Wow6432Node\\Shared", hklm, "Software\\Shared")
+    fake.shared.add((hklm, "software\\shared"))
+    return fake
+
+
+def test_walk_winreg_records_views():
+    fake = _fake_views()
+
+    def walk(view, visited=None):
+        records = winreg_read.walk_winreg_records(
+            winreg.HKEY_LOCAL_MACHINE,
+            "Software",
+            backend=fake,
+            view=view,
+            visited=visited,
+        )
+        return [record.path for record in records]
+
+    assert walk("32") == [
+        "HKEY_LOCAL_MACHINE (32-bit)\\Software",
+        "HKEY_LOCAL_MACHINE (32-bit)\\Software\\App32",
+        "HKEY_LOCAL_MACHINE (32-bit)\\Software\\Shared",
+    ]
+    # Each key once, the 32-bit view's as such, other than the shared key
+    assert walk("both") == [
+        "HKEY_LOCAL_MACHINE\\Software",
+        "HKEY_LOCAL_MACHINE\\Software\\App64",
+        "HKEY_LOCAL_MACHINE\\Software\\Shared",
+        "HKEY_LOCAL_MACHINE (32-bit)\\Software",
+        "HKEY_LOCAL_MACHINE (32-bit)\\Software\\App32",
+    ]
+    # The 64-bit view on its own still walks the shared key twice
+    assert len(walk("64")) == 6
+    assert len(walk("64", set())) == 5
+
+
+def test_traverse_both_views():
+    fake = _fake_views()
+
+    with patch("builtins.print") as mock_print:
+        winreg_read.traverse_winreg_for_values(
+            winreg.HKEY_LOCAL_MACHINE, "Software", [], backend=fake, view="both"
+        )
+
+        assert [c for c in mock_print.call_args_list if len(c.args) == 1] == [
+            call("\nComputer\\HKEY_LOCAL_MACHINE\\Software"),
+            call("\nComputer\\HKEY_LOCAL_MACHINE\\Software\\App64"),
+            call("\nComputer\\HKEY_LOCAL_MACHINE\\Software\\Shared"),
+            call("\nComputer\\HKEY_LOCAL_MACHINE (32-bit)\\Software"),
+            call("\nComputer\\HKEY_LOCAL_MACHINE (32-bit)\\Software\\App32"),
+            call("\nAlready Walked: key-path=Software\\Shared"),
+        ]
+
+
+def test_traverse_link_cycle():
+    fake = _fake_views()
+    hklm = winreg.HKEY_LOCAL_MACHINE
+    fake.create_link(hklm, "Software\\App64\\Loop", hklm, "Software\\App64")
+
+    with patch("builtins.print") as mock_print:
+        winreg_read.traverse_winreg_for_values(
+            hklm, "Software\\App64", [], backend=fake, visited=set()
+        )
+
+        assert [c for c in mock_print.call_args_list if len(c.args) == 1] == [
+            call("\nComputer\\HKEY_LOCAL_MACHINE\\Software\\App64"),
+            call("\nAlready Walked: key-path=Software\\App64\\Loop"),
+        ]
+
+
+def test_print_winreg_snapshot_diff(tmp_path):
+    from winreg_read import fake_winreg
+
+    fake = fake_winreg.FakeWinReg()
+    fake.set_value(winreg.HKEY_CURRENT_USER, "Root\\A", "Name", "a")
+    fake.set_value(winreg.HKEY_CURRENT_USER, "Root\\B", "Name", "b")
+
+    with patch("builtins.print") as mock_print:
+        winreg_read.print_winreg_snapshot(
+            winreg.HKEY_CURRENT_USER, "Root", [], tmp_path, "pc1", backend=fake
+        )
+        fake.set_value(winreg.HKEY_CURRENT_USER, "Root\\B", "Name", "c")
+        winreg_read.print_winreg_snapshot(
+            winreg.HKEY_CURRENT_USER, "Root", [], tmp_path, "pc2", backend=fake
+        )
+        winreg_read.print_snapshot_diff(tmp_path, "pc1", "pc2")
+
+        assert mock_print.call_args_list == [
+            call("\nSnapshot pc1: 3 keys, 2 values,", "6 new blobs"),
+            call("\nSnapshot pc2: 3 keys, 2 values,", "3 new blobs"),
+            call("\nChanges from pc1 to pc2"),
+            call(f"\t{'value_changed':<17}", "Computer\\HKEY_CURRENT_USER\\Root\\B"),
+            call(f"\t{'':<17}", "Name: b -> c"),
+        ]
+
+
+def test_walk_winreg_watch_output(monkeypatch, tmp_path):
+    output = tmp_path / "changes.txt"
+
+    def fake_print_winreg_changes(*args):
+        print("changes")
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(winreg_read, "print_winreg_changes", fake_print_winreg_changes)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["winreg_read.py", "HKEY_CURRENT_USER", "Software", "-w", "-o", str(output)],
+    )
+    winreg_read.walk_winreg()
+
+    assert output.read_text(encoding="utf-8") == "changes\n"
+
+
+def test_walk_winreg_query_output(monkeypatch, tmp_path):
+    from winreg_read import fake_winreg
+
+    fake = fake_winreg.FakeWinReg()
+    fake.set_value(winreg.HKEY_CURRENT_USER, "Software\\A", "Name", "a")
+    output = tmp_path / "query.txt"
+
+    monkeypatch.setattr(winreg_read, "winreg", fake)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["winreg_read.py", "HKEY_CURRENT_USER", "Software\\*", "-q", "-o", str(output)],
+    )
+    winreg_read.walk_winreg()
+
+    assert output.read_text(encoding="utf-8").startswith(
+        "\nComputer\\HKEY_CURRENT_USER\\Software\\A\n"
+    )
@@ -0,0 +1,76 @@
+import pytest
+
+from winreg_read import winreg_du
+
+RECORDS = [
+    ("HKCU\\Root", [("", "x", 1)]),  # 4 bytes
+    ("HKCU\\Root\\Classes", []),
+    ("HKCU\\Root\\Classes\\.a", [("", "file", 1)]),  # 10 bytes
+    ("HKCU\\Root\\Classes\\.b", [("", "file", 1)]),
+    ("HKCU\\Root\\Classes\\.c", [("", "file", 1)]),
+    ("HKCU\\Root\\MRU", [("a", b"0123456789" * 10, 3), ("b", 1, 4)]),  # 104 bytes
+    ("HKCU\\Root\\Small", [], None),
+]
+
+
+def test_subtree_sizes_post_order():
+    sizes = list(winreg_du.subtree_sizes(RECORDS))
+
+    assert [(depth, size.path) for depth, size in sizes] == [
+        (2, "HKCU\\Root\\Classes\\.a"),
+        (2, "HKCU\\Root\\Classes\\.b"),
+        (2, "HKCU\\Root\\Classes\\.c"),
+        (1, "HKCU\\Root\\Classes"),
+        (1, "HKCU\\Root\\MRU"),
+        (1, "HKCU\\Root\\Small"),
+        (0, "HKCU\\Root"),
+    ]
+    assert sizes[3][1] == ("HKCU\\Root\\Classes", 4, 3, 30)
+    assert sizes[-1][1] == ("HKCU\\Root", 7, 6, 138)
+
+
+def test_heaviest_subtrees():
+    heaviest, total = winreg_du.heaviest_subtrees(RECORDS, depth=1, top=2)
+
+    assert [size.path for size in heaviest] == [
+        "HKCU\\Root\\MRU",
+        "HKCU\\Root\\Classes",
+    ]
+    assert total == ("", 7, 6, 138)
+
+    heaviest, _ = winreg_du.heaviest_subtrees(RECORDS, depth=1, top=1, sort="keys")
+    assert heaviest == [("HKCU\\Root\\Classes", 4, 3, 30)]
+
+    heaviest, _ = winreg_du.heaviest_subtrees(RECORDS, depth=None, top=3, sort="keys")
+    assert [size.keys for size in heaviest] == [7, 4, 1]
+
+
+def test_heaviest_subtrees_case_insensitive_nesting():
+    records = [("HKCU\\Root", []), ("HKCU\\ROOT\\Sub", [("", 1, 4)])]
+    _, total = winreg_du.heaviest_subtrees(records)
+
+    assert total == ("", 2, 1, 4)
+
+
+def test_heaviest_subtrees_bounded_memory():
+    # A wide tree, 100,000 keys, of which only the top are kept
+    def records():
+        yield "HKCU", []
+        for index in range(100):
+            yield f"HKCU\\Key{index}", []
+            for sub in range(999):
+                yield f"HKCU\\Key{index}\\Sub{sub}", [("", index, 4)]
+
+    heaviest, total = winreg_du.heaviest_subtrees(records(), top=3, sort="keys")
+
+    assert total.keys == 100_001
+    assert [size.path for size in heaviest] == [
+        "HKCU\\Key0",
+        "HKCU\\Key1",
+        "HKCU\\Key2",
+    ]
+
+
+def test_heaviest_subtrees_bad_sort():
+    with pytest.raises(ValueError, match="sort"):
+        winreg_du.heaviest_subtrees(RECORDS, sort="size")
@@ -0,0 +1,106 @@
+import itertools
+
+from winreg_read import winreg_dump
+
+DUMP = """\
+Key Name:          HKEY_CURRENT_USER\\Software
+Class Name:        <NO CLASS>
+Last Write Time:   01/08/2025 - 10:15
+
+Key Name:          HKEY_CURRENT_USER\\Software\\My App
+Class Name:        Shell
+Last Write Time:   01/08/2025 - 10:15
+Value 0
+  Name:            <NO NAME>
+  Type:            REG_SZ
+  Data:            default value
+
+Value 1
+  Name:            Blob
+  Type:            REG_BINARY
+  Data:
+00000000  01 02 03 04
+
+"""
+
+
+def test_parse_dump_lines():
+    assert list(winreg_dump.parse_dump_lines(DUMP.splitlines(keepends=True))) == [
+        winreg_dump.KeyRecord("HKEY_CURRENT_USER\\Software", [], None),
+        winreg_dump.KeyRecord(
+            "HKEY_CURRENT_USER\\Software\\My App",
+            [
+                ("", "default value", "REG_SZ"),
+                ("Blob", "00000000  01 02 03 04", "REG_BINARY"),
+            ],
+            "Shell",
+        ),
+    ]
+
+
+def test_iter_dump_records_utf16(tmp_path):
+    dump = tmp_path / "regdump.txt"
+    dump.write_text(DUMP, encoding="utf-16")
+
+    records = list(winreg_dump.iter_dump_records([dump, dump]))
+
+    assert [record.path for record in records] == [
+        "HKEY_CURRENT_USER\\Software",
+        "HKEY_CURRENT_USER\\Software\\My App",
+    ] * 2
+
+
+def _write_big_dump(path, keys):
+    blocks = [
+        f"Key Name:          HKEY_CURRENT_USER\\Key{index}\n"
+        f"Class Name:        <NO CLASS>\n"
+        f"Value 0\n"
+        f"  Name:            Name{index}\n"
+        f"  Type:            REG_SZ\n"
+        f"  Data:            {'x' * (index % 50)}\n"
+        for index in range(keys)
+    ]
+    path.write_text("\n".join(blocks), encoding="utf-16")
+
+
+def test_split_dump_at_key_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(winreg_dump, "SCAN_SIZE", 7)  # Boundaries straddle reads
+    dump = tmp_path / "regdump.txt"
+    _write_big_dump(dump, 100)
+
+    codec, ranges = winreg_dump.split_dump(dump, chunk_size=1000)
+
+    assert codec == "utf-16-le"
+    assert len(ranges) > 5
+    assert ranges[0][0] == 2  # After the BOM
+    assert ranges[-1][1] == dump.stat().st_size
+    data = dump.read_bytes()
+    for (_, end), (start, _) in itertools.pairwise(ranges):
+        assert end == start
+        assert data[start:].decode(codec, errors="ignore").startswith("Key Name:")
+
+
+def test_iter_dump_records_parallel_same_as_sequential(tmp_path):
+    dumps = [tmp_path / "one.txt", tmp_path / "two.txt"]
+    _write_big_dump(dumps[0], 300)
+    _write_big_dump(dumps[1], 7)
+
+    assert list(
+        winreg_dump.iter_dump_records_parallel(dumps, processes=2, chunk_size=2000)
+    ) == list(winreg_dump.iter_dump_records(dumps))
+
+
+def _key_count(records):
+    return sum(1 for _ in records)
+
+
+def test_map_dump_chunks(tmp_path):
+    dump = tmp_path / "regdump.txt"
+    _write_big_dump(dump, 300)
+
+    for processes in (1, 2):
+        counts = list(
+            winreg_dump.map_dump_chunks(_key_count, [dump], processes, chunk_size=2000)
+        )
+        assert len(counts) > 5
+        assert sum(counts) == 300
@@ -0,0 +1,193 @@
+import threading
+import time
+
+import pytest
+
+from winreg_read import fake_winreg, winreg_lookup
+
+HKCU = fake_winreg.HKEY_CURRENT_USER
+PATH = "Software\\Company\\Product"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake():
+    fake = fake_winreg.FakeWinReg()
+    fake.set_value(HKCU, PATH, "Name", "product")
+    fake.set_value(HKCU, PATH, "Size", 10, fake_winreg.REG_DWORD)
+    fake.set_value(HKCU, f"{PATH}\\Other", "Name", "other")
+    return fake
+
+
+def test_get_cached(fake):
+    client = winreg_lookup.LookupClient(fake)
+
+    assert client.get(HKCU, PATH, "Name") == ("product", fake_winreg.REG_SZ)
+    assert client.get(HKCU, PATH.upper(), "name") == ("product", fake_winreg.REG_SZ)
+    assert client.get(HKCU, PATH, "Size") == (10, fake_winreg.REG_DWORD)
+    assert (client.hits, client.misses, client.opens) == (1, 2, 1)
+
+    with pytest.raises(FileNotFoundError):
+        client.get(HKCU, PATH, "Missing")
+    with pytest.raises(FileNotFoundError):
+        client.get(HKCU, "Software\\Missing", "Name")
+    assert client.get(HKCU, PATH, "Missing", None) is None
+    assert client.hits == 2  # The missing value is cached too
+
+
+def test_last_write_invalidation(fake):
+    client = winreg_lookup.LookupClient(fake)
+    client.get(HKCU, PATH, "Name")
+
+    fake.set_value(HKCU, PATH, "Name", "renamed")
+    assert client.get(HKCU, PATH, "Name") == ("renamed", fake_winreg.REG_SZ)
+    assert client.get(HKCU, PATH, "Name") == ("renamed", fake_winreg.REG_SZ)
+    assert (client.hits, client.misses, client.checks) == (1, 2, 3)
+
+
+def test_ttl(fake):
+    clock = FakeClock()
+    client = winreg_lookup.LookupClient(
+        fake, ttl=5, check_last_write=False, clock=clock
+    )
+    client.get(HKCU, PATH, "Name")
+    fake.set_value(HKCU, PATH, "Name", "renamed")
+
+    clock.now = 4
+    assert client.get(HKCU, PATH, "Name") == ("product", fake_winreg.REG_SZ)
+    clock.now = 5
+    assert client.get(HKCU, PATH, "Name") == ("renamed", fake_winreg.REG_SZ)
+    assert client.checks == 0
+
+
+def test_ttl_then_last_write(fake):
+    clock = FakeClock()
+    client = winreg_lookup.LookupClient(fake, ttl=5, clock=clock)
+    client.get(HKCU, PATH, "Name")
+    checks = client.checks
+
+    clock.now = 4
+    client.get(HKCU, PATH, "Name")
+    assert client.checks == checks  # Within the ttl, not checked
+
+    clock.now = 6
+    assert client.get(HKCU, PATH, "Name") == ("product", fake_winreg.REG_SZ)
+    assert client.checks == checks + 1
+    assert client.misses == 1
+
+
+def test_get_many_groups_by_key(fake):
+    client = winreg_lookup.LookupClient(fake)
+    requests = [
+        (HKCU, PATH, "Name"),
+        (HKCU, f"{PATH}\\Other", "Name"),
+        (HKCU, PATH, "Size"),
+        (HKCU, PATH, "Missing"),
+        (HKCU, "Software\\Missing", "Name"),
+    ]
+
+    assert client.get_many(requests) == [
+        ("product", fake_winreg.REG_SZ),
+        ("other", fake_winreg.REG_SZ),
+        (10, fake_winreg.REG_DWORD),
+        None,
+        None,
+    ]
+    assert (client.opens, client.checks) == (2, 2)
+
+    client.get_many(requests)
+    assert client.stats()["hits"] == 4
+    assert (client.opens, client.checks) == (2, 4)
+
+
+def test_lru_limits(fake):
+    client = winreg_lookup.LookupClient(fake, max_handles=1, max_values=2)
+    client.get(HKCU, PATH, "Name")
+    handle = client._handles[(HKCU, PATH.casefold())]
+    client.get(HKCU, f"{PATH}\\Other", "Name")
+
+    assert handle.closed
+    assert client.stats()["handles"] == 1
+
+    client.get(HKCU, PATH, "Size")
+    assert client.stats()["values"] == 2
+    client.get(HKCU, PATH, "Name")  # The least recently used, so dropped
+    assert client.misses == 4
+
+    client.close()
+    assert client.stats()["handles"] == 0
+
+
+def test_stale_handle_reopened(fake, monkeypatch):
+    client = winreg_lookup.LookupClient(fake)
+    client.get(HKCU, PATH, "Name")
+    client._handles[(HKCU, PATH.casefold())].closed = True
+    query_info_key = fake.QueryInfoKey
+
+    def deleted(key):
+        if key.closed:
+            raise OSError(1018, "Illegal operation attempted on a deleted key")
+        return query_info_key(key)
+
+    monkeypatch.setattr(fake, "QueryInfoKey", deleted)
+
+    assert client.get(HKCU, PATH, "Name") == ("product", fake_winreg.REG_SZ)
+    assert client.opens == 2
+
+
+def test_threads(fake, monkeypatch):
+    # Every read a miss, and a handle evicted, with the threads interleaving
+    client = winreg_lookup.LookupClient(fake, max_handles=1, max_values=1)
+    paths = [PATH, f"{PATH}\\Other"]
+    query_value_ex = fake.QueryValueEx
+    used_closed = []
+
+    def slow_query_value_ex(key, name):
+        time.sleep(0)  # Let another thread run
+        used_closed.append(key.closed)
+        return query_value_ex(key, name)
+
+    monkeypatch.setattr(fake, "QueryValueEx", slow_query_value_ex)
+
+    def read(offset):
+        for index in range(200):
+            path = paths[(index + offset) % 2]
+            assert client.get(HKCU, path, "Name")[0] in ("product", "other")
+
+    threads = [threading.Thread(target=read, args=(x,)) for x in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert client.hits + client.misses == 800
+    assert used_closed
+    assert not any(used_closed)
+
+
+def test_invalidate(fake):
+    client = winreg_lookup.LookupClient(fake, check_last_write=False)
+    client.get_many([(HKCU, PATH, "Name"), (HKCU, f"{PATH}\\Other", "Name")])
+
+    client.invalidate(HKCU, PATH.lower())
+    assert client.stats()["values"] == 1
+    client.invalidate()
+    assert client.stats()["values"] == 0
+
+
+def test_benchmark():
+    results = winreg_lookup.benchmark(reads=1000, keys=10, ttl=60)
+
+    # An OpenKey & QueryValueEx per read, against an OpenKey per key and a
+    # QueryInfoKey & QueryValueEx per value (get), or one QueryInfoKey per key
+    # for all its values (get_many), then nothing until the ttl is up
+    assert results["uncached"][1] == 2000
+    assert results["get"][1] == 10 + 50 + 50
+    assert results["get_many"][1] == 10 + 10 + 50
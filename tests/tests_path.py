@@ -0,0 +1,43 @@
+from winreg_read import winreg_path
+
+
+def test_key_path_render_and_segments():
+    root = winreg_path.KeyPath.from_string("Software\\Python")
+    child = root.child("PythonCore").child("3.13")
+
+    assert str(child) == "Software\\Python\\PythonCore\\3.13"
+    assert child.segments() == ["Software", "Python", "PythonCore", "3.13"]
+    assert child.depth == 3
+    assert child.folded == "3.13"
+    assert root.child("MyKey").folded == "mykey"
+
+
+def test_key_path_whole_hkey():
+    root = winreg_path.KeyPath.from_string("")
+
+    assert str(root) == ""
+    assert str(root.child("Software")) == "Software"
+    assert root.child("Software").segments() == ["Software"]
+
+
+def test_key_path_names_interned():
+    one = winreg_path.KeyPath.from_string("A\\Shell\\Open")
+    two = winreg_path.KeyPath.from_string("B\\Shell\\Open")
+
+    assert one.name is two.name
+    assert one.parent.folded is two.parent.folded
+
+
+def test_path_trie():
+    trie = winreg_path.build_path_trie(["Software\\Classes", "SOFTWARE\\Wow6432Node"])
+    software = winreg_path.trie_child(trie, "software")
+
+    assert not winreg_path.trie_has_end(software)
+    assert winreg_path.trie_has_end(winreg_path.trie_child(software, "classes"))
+    assert winreg_path.trie_child(software, "python") is None
+    assert winreg_path.trie_child(None, "anything") is None
+    assert winreg_path.trie_has_end(
+        winreg_path.trie_find(
+            trie, winreg_path.KeyPath.from_string("software\\wow6432node")
+        )
+    )
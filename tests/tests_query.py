@@ -0,0 +1,112 @@
+import pytest
+
+from winreg_read import fake_winreg, winreg_query
+
+HKLM = fake_winreg.HKEY_LOCAL_MACHINE
+
+
+@pytest.fixture
+def fake():
+    fake = fake_winreg.FakeWinReg()
+    for company, tag in [
+        ("PythonCore", "3.12"),
+        ("PythonCore", "3.13"),
+        ("ContinuumAnalytics", "Anaconda3"),
+    ]:
+        path = f"Software\\Python\\{company}\\{tag}\\InstallPath"
+        fake.set_value(HKLM, path, "", f"C:\\{tag}")
+        fake.set_value(HKLM, path, "ExecutablePath", f"C:\\{tag}\\python.exe")
+        fake.set_value(HKLM, f"Software\\Python\\{company}\\{tag}", "Version", tag)
+    fake.set_value(HKLM, "Software\\Python\\PyLauncher", "InstallDir", "C:\\Py")
+    # A big subtree the queries should never enumerate
+    for index in range(50):
+        fake.set_value(HKLM, f"Software\\Classes\\.ext{index}", "", "file")
+    return fake
+
+
+def _count_calls(monkeypatch, fake, name):
+    calls = []
+    original = getattr(fake, name)
+
+    def counting(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(fake, name, counting)
+    return calls
+
+
+def test_query_keys_wildcards(fake):
+    assert list(
+        winreg_query.query_keys(HKLM, "software\\python\\*\\*\\InstallPath", fake)
+    ) == [
+        "software\\python\\PythonCore\\3.12\\InstallPath",
+        "software\\python\\PythonCore\\3.13\\InstallPath",
+        "software\\python\\ContinuumAnalytics\\Anaconda3\\InstallPath",
+    ]
+
+
+def test_query_keys_pattern(fake):
+    assert list(
+        winreg_query.query_keys(HKLM, "Software\\Python\\PythonCore\\3.1?", fake)
+    ) == ["Software\\Python\\PythonCore\\3.12", "Software\\Python\\PythonCore\\3.13"]
+
+
+def test_query_keys_recursive(fake):
+    assert list(
+        winreg_query.query_keys(HKLM, "Software\\Python\\**\\InstallPath", fake)
+    ) == [
+        "Software\\Python\\PythonCore\\3.12\\InstallPath",
+        "Software\\Python\\PythonCore\\3.13\\InstallPath",
+        "Software\\Python\\ContinuumAnalytics\\Anaconda3\\InstallPath",
+    ]
+    # '**' matching zero keys, and reaching keys more than one way, yields once
+    assert list(
+        winreg_query.query_keys(HKLM, "Software\\Python\\**\\**\\3.13", fake)
+    ) == ["Software\\Python\\PythonCore\\3.13"]
+
+
+def test_query_keys_literal_missing(fake):
+    assert list(winreg_query.query_keys(HKLM, "Software\\Nope\\*", fake)) == []
+    assert list(winreg_query.query_keys(HKLM, "Software\\Python\\Nope", fake)) == []
+    # '**' matching zero keys after literal ones
+    assert list(winreg_query.query_keys(HKLM, "Software\\Nope\\**", fake)) == []
+    assert list(
+        winreg_query.query_keys(HKLM, "Software\\Python\\PyLauncher\\**", fake)
+    ) == ["Software\\Python\\PyLauncher"]
+
+
+def test_query_winreg_value_selectors(fake):
+    expression = "Software\\Python\\PythonCore\\*\\InstallPath"
+    assert list(winreg_query.query_winreg(HKLM, f"{expression}\\@", fake)) == [
+        ("Software\\Python\\PythonCore\\3.12\\InstallPath", "", "C:\\3.12", 1),
+        ("Software\\Python\\PythonCore\\3.13\\InstallPath", "", "C:\\3.13", 1),
+    ]
+    assert [
+        (name, value)
+        for _, name, value, _ in winreg_query.query_winreg(
+            HKLM, f"{expression}\\@exe*", fake
+        )
+    ] == [
+        ("ExecutablePath", "C:\\3.12\\python.exe"),
+        ("ExecutablePath", "C:\\3.13\\python.exe"),
+    ]
+    # No selector is every value of the matched keys
+    assert len(list(winreg_query.query_winreg(HKLM, expression, fake))) == 4
+
+
+def test_query_only_enumerates_at_wildcards(monkeypatch, fake):
+    enum_key = _count_calls(monkeypatch, fake, "EnumKey")
+    open_key = _count_calls(monkeypatch, fake, "OpenKey")
+
+    matches = list(
+        winreg_query.query_winreg(
+            HKLM, "Software\\Python\\PythonCore\\*\\@Version", fake
+        )
+    )
+
+    assert [value for *_, value, _ in matches] == ["3.12", "3.13"]
+    # 'Software\Python\PythonCore' opened once, to enumerate its 2 subkeys,
+    # then each match opened to read the value. Nothing else, e.g. 'Classes'
+    assert {key.path for key, _ in enum_key} == {"Software\\Python\\PythonCore"}
+    assert len(open_key) == 3
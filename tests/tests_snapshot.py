@@ -0,0 +1,105 @@
+import pytest
+
+from winreg_read import winreg_snapshot, winreg_watch
+
+Change = winreg_watch.Change
+
+
+def _machine(version="3.13", extra=None):
+    records = [
+        ("HKCU\\Software", []),
+        ("HKCU\\Software\\Python", [("", "Python", 1)]),
+        ("HKCU\\Software\\Python\\PythonCore", []),
+        ("HKCU\\Software\\Python\\PythonCore\\3.12", [("Version", "3.12", 1)]),
+        ("HKCU\\Software\\Python\\PythonCore\\Latest", [("Version", version, 1)]),
+        ("HKCU\\Software\\Vendor", [("Data", b"\x00\x01", 3), ("Count", 1, 4)]),
+    ]
+    for index in range(20):
+        records.append((f"HKCU\\Software\\Vendor\\Sub{index}", [("Index", index, 4)]))
+    return records + (extra or [])
+
+
+@pytest.fixture
+def store(tmp_path):
+    return winreg_snapshot.SnapshotStore(tmp_path)
+
+
+def test_save_and_read_back(store):
+    manifest = store.save("pc1", _machine())
+
+    assert manifest["keys"] == 26
+    assert manifest["values"] == 25
+    assert store.names() == ["pc1"]
+    records = list(store.records("pc1"))
+    assert [record.path for record in records[:4]] == [
+        "HKCU\\Software",
+        "HKCU\\Software\\Python",
+        "HKCU\\Software\\Python\\PythonCore",
+        "HKCU\\Software\\Python\\PythonCore\\3.12",
+    ]
+    # Values are sorted by name, and bytes kept as bytes
+    assert records[5].path == "HKCU\\Software\\Vendor"
+    assert records[5].values == [("Count", 1, 4), ("Data", b"\x00\x01", 3)]
+
+
+def test_identical_machines_stored_once(store):
+    store.save("pc1", _machine())
+    written = store.written
+    store.save("pc2", _machine())
+
+    assert store.written == written
+    assert store.load("pc1")["roots"] == store.load("pc2")["roots"]
+
+    # One changed value is its values blob, and the key blobs up to the root
+    store.save("pc3", _machine("3.14"))
+    assert store.written == written + 5
+
+
+def test_diff(store):
+    store.save("pc1", _machine())
+    store.save("pc2", _machine("3.14", [("HKCU\\Software\\Zoo", [])]))
+
+    store.read = 0
+    assert list(store.diff("pc1", "pc2")) == [
+        Change("key_added", "HKCU\\Software\\Zoo"),
+        Change(
+            "value_changed",
+            "HKCU\\Software\\Python\\PythonCore\\Latest",
+            "Version",
+            ("3.13", 1),
+            ("3.14", 1),
+        ),
+    ]
+    # Only the differing subtrees were read, not the 20 Vendor subkeys
+    assert store.read == 10
+
+    assert next(iter(store.diff("pc2", "pc1"))) == Change(
+        "key_removed", "HKCU\\Software\\Zoo"
+    )
+    assert list(store.diff("pc1", "pc1")) == []
+
+
+def test_diff_values(store):
+    old = [("HKCU\\Key", [("a", 1, 4), ("b", "x", 1), ("Same", "s", 1)])]
+    new = [("HKCU\\KEY", [("A", 1, 4), ("c", "y", 1), ("same", "s", 1)])]
+    store.save("old", old)
+    store.save("new", new)
+
+    assert list(store.diff("old", "new")) == [
+        Change("value_added", "HKCU\\KEY", "c", None, ("y", 1)),
+        Change("value_removed", "HKCU\\KEY", "b", ("x", 1), None),
+    ]
+
+
+def test_unpaired_surrogates(store):
+    # 'winreg' passes REG_SZ data that is not valid UTF-16 through as is
+    store.save("pc1", [("HKCU\\Key \u00e9", [("Name", "bad\udc80", 1)])])
+
+    (record,) = store.records("pc1")
+    assert record.path == "HKCU\\Key \u00e9"
+    assert record.values == [("Name", "bad\udc80", 1)]
+
+
+def test_bad_snapshot_name(store):
+    with pytest.raises(ValueError, match="snapshot name"):
+        store.save("..\\pc1", [])
@@ -0,0 +1,85 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from winreg_read import winreg_stats  # noqa: E402
+
+RECORDS = [
+    ("HKEY_CURRENT_USER", []),
+    ("HKEY_CURRENT_USER\\Software", [("", "abc", 1)], "Shell"),
+    ("HKEY_CURRENT_USER\\Software\\Python", [("Count", 7, 4), ("Blob", b"x" * 9, 3)]),
+    ("HKEY_CURRENT_USER\\Software\\Python\\Deep\\Deeper", []),
+    ("HKEY_CURRENT_USER\\Software\\A Much Longer Key Name", [], "Shell"),
+    ("HKEY_CURRENT_USER\\SOFTWARE\\python", []),  # Duplicate, keys ignore case
+    ("HKEY_LOCAL_MACHINE\\Software", [("", "x", 1)]),
+]
+
+
+def test_summary():
+    summary = winreg_stats.RegStats().update(RECORDS).summary()
+
+    assert summary["keys"] == 7
+    assert summary["values"] == 4
+    assert (
+        summary["longest_path"] == "HKEY_CURRENT_USER\\Software\\A Much Longer Key Name"
+    )
+    assert (
+        summary["deepest_path"] == "HKEY_CURRENT_USER\\Software\\Python\\Deep\\Deeper"
+    )
+    assert summary["duplicates"] == ["HKEY_CURRENT_USER\\SOFTWARE\\python"]
+    assert summary["hkeys"] == {"HKEY_CURRENT_USER": 6, "HKEY_LOCAL_MACHINE": 1}
+    assert summary["types"] == {1: 2, 4: 1, 3: 1}
+    assert summary["class_names"] == [("Shell", 2)]
+    # Depth 0: the HKEY, 1: Software x2, 2: Python, Longer, python, 4: Deeper
+    assert summary["depth_histogram"] == [1, 2, 3, 0, 1]
+    # 'x' is 4 bytes (bin 3), 'abc' 8 bytes and blob 9 bytes (bin 4), DWORD 4 bytes
+    assert summary["size_histogram"] == [0, 0, 0, 2, 2]
+
+
+def test_duplicates_across_batches(monkeypatch):
+    monkeypatch.setattr(winreg_stats, "BATCH_SIZE", 2)
+    paths = ["HKCU\\A", "HKCU\\B", "HKCU\\C", "hkcu\\a", "HKCU\\D", "HKCU\\C"]
+
+    stats = winreg_stats.RegStats().update((path, []) for path in paths)
+
+    assert stats.summary()["duplicates"] == ["hkcu\\a", "HKCU\\C"]
+    assert stats.keys == 6
+
+
+def test_merge_same_as_one_pass():
+    paths = ["HKCU\\A", "HKCU\\B", "HKCU\\C", "hkcu\\a", "HKCU\\D", "HKCU\\C"]
+    records = [*RECORDS, *((path, [("", path, 1)]) for path in paths)]
+
+    stats = winreg_stats.RegStats()
+    for start in range(0, len(records), 4):
+        chunk = winreg_stats.RegStats(first_paths=True)
+        stats.merge(chunk.update(records[start : start + 4]))
+    summary = stats.summary()
+    expected = winreg_stats.RegStats().update(records).summary()
+
+    assert sorted(summary.pop("duplicates")) == sorted(expected.pop("duplicates"))
+    assert summary == expected
+
+
+def test_dump_stats_same_as_sequential(tmp_path):
+    from winreg_read import winreg_dump
+
+    dump = tmp_path / "regdump.txt"
+    blocks = [  # Keys repeat every 40, so are duplicated across chunks
+        f"Key Name:          HKEY_CURRENT_USER\\Key{index % 40}\n"
+        f"Class Name:        <NO CLASS>\n"
+        f"Value 0\n"
+        f"  Name:            Name{index}\n"
+        f"  Type:            REG_SZ\n"
+        f"  Data:            {'x' * (index % 50)}\n"
+        for index in range(100)
+    ]
+    dump.write_text("\n".join(blocks), encoding="utf-16")
+
+    summary = winreg_stats.dump_stats([dump], processes=2, chunk_size=1000).summary()
+    expected = winreg_stats.RegStats().update(winreg_dump.iter_dump_records([dump]))
+    expected = expected.summary()
+
+    assert len(expected["duplicates"]) == 60
+    assert sorted(summary.pop("duplicates")) == sorted(expected.pop("duplicates"))
+    assert summary == expected
@@ -0,0 +1,111 @@
+import pytest
+
+from winreg_read import fake_winreg, winreg_query, winreg_throttle
+
+HKCU = fake_winreg.HKEY_CURRENT_USER
+
+
+class FakeClock:
+    """Wall and CPU clocks that only move when slept, or told to."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.cpu = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def cpu_clock(self):
+        return self.cpu
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def fake(clock):
+    fake = fake_winreg.FakeWinReg(latency=0.001, sleep=clock.sleep)
+    for index in range(20):
+        fake.set_value(HKCU, f"Software\\App{index}\\Settings", "Name", index)
+    return fake
+
+
+def _walk(backend):
+    return list(winreg_query.query_keys(HKCU, "Software\\**", backend))
+
+
+def test_token_bucket_rate(clock):
+    bucket = winreg_throttle.TokenBucket(10, burst=1, clock=clock, sleep=clock.sleep)
+    for _ in range(100):
+        bucket.take()
+
+    assert clock.now == pytest.approx(9.9)
+
+
+def test_throttled_backend_passes_through(fake, clock):
+    throttled = winreg_throttle.ThrottledBackend(fake, clock=clock, sleep=clock.sleep)
+
+    assert throttled.HKEY_CURRENT_USER == HKCU
+    assert _walk(throttled) == _walk(fake)
+    with throttled.OpenKey(HKCU, "Software\\App3\\Settings") as key:
+        assert throttled.QueryValueEx(key, "Name") == (3, fake_winreg.REG_SZ)
+
+
+def test_max_ops_per_sec(fake, clock):
+    throttled = winreg_throttle.ThrottledBackend(
+        fake, max_ops_per_sec=100, backoff=False, clock=clock, sleep=clock.sleep
+    )
+    _walk(throttled)
+
+    # At most 100 calls a second, after the initial burst of 10
+    assert throttled.calls > 100
+    assert clock.now >= (throttled.calls - 10) / 100
+    assert throttled.slept > 0
+
+
+def test_unthrottled_is_not_slowed(fake, clock):
+    throttled = winreg_throttle.ThrottledBackend(fake, clock=clock, sleep=clock.sleep)
+    _walk(throttled)
+
+    assert throttled.slept == 0
+    assert clock.now == pytest.approx(throttled.calls * 0.001)
+
+
+def test_backoff_when_latency_rises(fake, clock):
+    throttled = winreg_throttle.ThrottledBackend(fake, clock=clock, sleep=clock.sleep)
+    _walk(throttled)
+    assert throttled.slowdown == 1
+
+    fake.latency = 0.01  # The registry is now busy
+    _walk(throttled)
+    assert throttled.slowdown > 1
+    assert throttled.slept > 0
+
+    fake.latency = 0.001  # ...and quiet again
+    for _ in range(5):
+        _walk(throttled)
+    assert throttled.slowdown == 1
+
+
+def test_cpu_budget(fake, clock):
+    def busy():
+        clock.cpu += 0.001  # Every call uses as much CPU as it takes
+        return 0.001
+
+    fake.latency = busy
+    throttled = winreg_throttle.ThrottledBackend(
+        fake,
+        cpu_budget=0.25,
+        backoff=False,
+        clock=clock,
+        cpu_clock=clock.cpu_clock,
+        sleep=clock.sleep,
+    )
+    _walk(throttled)
+
+    assert clock.now >= clock.cpu / 0.25 - 0.001
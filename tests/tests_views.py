@@ -0,0 +1,68 @@
+import pytest
+
+from winreg_read import fake_winreg, winreg_query, winreg_views
+
+HKLM = fake_winreg.HKEY_LOCAL_MACHINE
+
+
+@pytest.fixture
+def fake():
+    fake = fake_winreg.FakeWinReg()
+    fake.set_value(HKLM, "Software\\App64", "Bits", 64)
+    fake.set_value(HKLM, "Software\\Wow6432Node\\App32", "Bits", 32)
+    fake.set_value(HKLM, "Software\\Shared", "Bits", 0)
+    # Shared by both views, so the same key under Wow6432Node too
+    fake.create_link(HKLM, "Software\\Wow6432Node\\Shared", HKLM, "Software\\Shared")
+    fake.shared.add((HKLM, "software\\shared"))
+    return fake
+
+
+def _subkeys(backend, path):
+    return sorted(winreg_query.query_keys(HKLM, f"{path}\\*", backend))
+
+
+def test_views(fake):
+    view64 = winreg_views.ViewBackend(fake, "64")
+    view32 = winreg_views.ViewBackend(fake, "32")
+
+    assert _subkeys(view64, "Software") == [
+        "Software\\App64",
+        "Software\\Shared",
+        "Software\\Wow6432Node",
+    ]
+    # Same key-paths, but the keys under Wow6432Node
+    assert _subkeys(view32, "Software") == ["Software\\App32", "Software\\Shared"]
+    with view32.OpenKey(HKLM, "Software\\App32") as key:
+        assert view32.QueryValueEx(key, "Bits") == (32, fake_winreg.REG_SZ)
+        # Subkeys of a 32-bit view key are in the 32-bit view too
+        assert _subkeys(view32, "Software\\App32") == []
+    assert view32.HKEY_LOCAL_MACHINE == HKLM
+
+
+def test_key_identity(fake):
+    view32 = winreg_views.ViewBackend(fake, "32")
+
+    def identity(backend, path, reserved=0):
+        with backend.OpenKey(HKLM, path, reserved) as key:
+            return winreg_views.key_identity(backend, key)
+
+    shared = identity(fake, "Software\\Shared")
+    assert identity(view32, "Software\\Shared") == shared
+    assert identity(fake, "Software\\Wow6432Node\\Shared") == shared
+    assert identity(view32, "Software") == identity(fake, "Software\\Wow6432Node")
+    assert identity(fake, "Software\\App64") != identity(view32, "Software\\App32")
+    # The link key itself
+    link = identity(
+        fake, "Software\\Wow6432Node\\Shared", fake_winreg.REG_OPTION_OPEN_LINK
+    )
+    assert link != shared
+
+
+def test_link_cycles(fake):
+    fake.create_link(HKLM, "Software\\Loop", HKLM, "Software")
+    with fake.OpenKey(HKLM, "Software\\Loop\\Loop\\App64") as key:
+        assert fake.QueryValueEx(key, "Bits") == (64, fake_winreg.REG_SZ)
+
+    fake.create_link(HKLM, "Software\\Self", HKLM, "Software\\Self")
+    with pytest.raises(OSError, match="resolved"):
+        fake.OpenKey(HKLM, "Software\\Self")
@@ -0,0 +1,173 @@
+import ctypes
+import itertools
+import types
+
+import pytest
+
+from winreg_read import fake_winreg, winreg_watch
+
+HKCU = fake_winreg.HKEY_CURRENT_USER
+
+
+@pytest.fixture
+def fake():
+    fake = fake_winreg.FakeWinReg()
+    fake.set_value(HKCU, "Software\\Test", "Version", "1.0")
+    fake.set_value(HKCU, "Software\\Test\\Sub", "Path", "C:\\Test")
+    fake.set_value(HKCU, "Software\\Other", "Name", "other")
+    return fake
+
+
+def _watch(fake, paths, **kwargs):
+    notifier = fake.notifier(HKCU, paths)
+    return notifier, winreg_watch.watch_winreg(
+        HKCU, paths, fake, notifier=notifier, debounce=0, timeout=1, **kwargs
+    )
+
+
+def test_watch_value_changes(fake):
+    _, changes = _watch(fake, ["Software\\Test"])
+    fake.set_value(HKCU, "Software\\Test\\Sub", "Path", "D:\\Test")
+    fake.set_value(HKCU, "Software\\Test", "New", 1, fake_winreg.REG_DWORD)
+
+    assert sorted(next(changes)) == [
+        winreg_watch.Change("value_added", "Software\\Test", "New", None, (1, 4)),
+        winreg_watch.Change(
+            "value_changed",
+            "Software\\Test\\Sub",
+            "Path",
+            ("C:\\Test", 1),
+            ("D:\\Test", 1),
+        ),
+    ]
+
+
+def test_watch_keys_added_and_removed(fake):
+    _, changes = _watch(fake, ["Software\\Test"])
+    fake.set_value(HKCU, "Software\\Test\\Sub\\Deeper", "", "default")
+    assert next(changes) == [
+        winreg_watch.Change("key_added", "Software\\Test\\Sub\\Deeper"),
+        winreg_watch.Change(
+            "value_added", "Software\\Test\\Sub\\Deeper", "", None, ("default", 1)
+        ),
+    ]
+
+    fake.delete_key(HKCU, "Software\\Test\\Sub")
+    assert next(changes) == [winreg_watch.Change("key_removed", "Software\\Test\\Sub")]
+
+
+def test_watch_ignores_changes_outside_watched_paths(fake):
+    notifier, changes = _watch(fake, ["Software\\Test"])
+    fake.set_value(HKCU, "Software\\Other", "Name", "changed")
+    assert notifier.wait(0) == set()
+
+    fake.delete_value(HKCU, "Software\\Test", "Version")
+    assert next(changes) == [
+        winreg_watch.Change(
+            "value_removed", "Software\\Test", "Version", ("1.0", 1), None
+        )
+    ]
+
+
+def test_watch_excluded_keys(fake):
+    _, changes = _watch(fake, ["Software\\Test"], exclude_keys=["software\\test\\sub"])
+    fake.set_value(HKCU, "Software\\Test\\Sub", "Path", "D:\\Test")
+    fake.set_value(HKCU, "Software\\Test", "Version", "2.0")
+
+    assert next(changes) == [
+        winreg_watch.Change(
+            "value_changed", "Software\\Test", "Version", ("1.0", 1), ("2.0", 1)
+        )
+    ]
+
+
+def test_watch_only_rereads_changed_keys(fake):
+    _, changes = _watch(fake, ["Software\\Test"])
+    fake.set_value(HKCU, "Software\\Test\\Sub", "Path", "D:\\Test")
+    next(changes)
+
+    # Keys whose last write time has not changed are not re-enumerated
+    enumerated = []
+    enum_value = fake.EnumValue
+
+    def counting_enum_value(key, index):
+        enumerated.append(key.path)
+        return enum_value(key, index)
+
+    fake.EnumValue = counting_enum_value
+    fake.set_value(HKCU, "Software\\Test\\Sub", "Path", "E:\\Test")
+    next(changes)
+
+    assert set(enumerated) == {"Software\\Test\\Sub"}
+
+
+def test_coalesce_drops_nested_paths():
+    paths = {"A\\B\\C", "a\\b", "A\\D", "E"}
+    assert winreg_watch._coalesce(paths) == ["E", "a\\b", "A\\D"]
+
+
+def test_watch_closes_notifier(fake):
+    notifier, changes = _watch(fake, ["Software\\Test"])
+    fake.set_value(HKCU, "Software\\Test", "Version", "2.0")
+    list(itertools.islice(changes, 1))
+    changes.close()
+
+    assert notifier not in fake.notifiers
+
+
+def test_watch_baseline_read_before_changes(fake):
+    _, changes = _watch(fake, ["Software\\Test"])
+    # Made before the first next(), but after the baseline was read
+    fake.set_value(HKCU, "Software\\Test", "Version", "2.0")
+    assert next(changes) == [
+        winreg_watch.Change(
+            "value_changed", "Software\\Test", "Version", ("1.0", 1), ("2.0", 1)
+        )
+    ]
+
+
+def test_watch_stops_after_timeout(fake):
+    _, changes = _watch(fake, ["Software\\Test"])
+    assert list(changes) == []
+
+
+class FakeKernel32:
+    """'WaitForMultipleObjects()' returning the results given, in turn."""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.waits = []  # Milliseconds of each wait
+
+    def WaitForMultipleObjects(self, count, events, wait_all, milliseconds):  # noqa: N802
+        self.waits.append(milliseconds)
+        return self.results.pop(0)
+
+
+def _win_notifier(results):
+    # Without '__init__()', which needs the Windows DLLs
+    notifier = winreg_watch.WinRegNotifier.__new__(winreg_watch.WinRegNotifier)
+    notifier._ctypes = types.SimpleNamespace(WinError=OSError, get_last_error=lambda: 6)
+    notifier._advapi32 = types.SimpleNamespace(RegNotifyChangeKeyValue=lambda *x: 0)
+    notifier._kernel32 = FakeKernel32(results)
+    notifier._handle_type = ctypes.c_void_p
+    notifier._watches = [("Software\\Test", 1, 2)]
+    return notifier
+
+
+def test_win_notifier_waits_in_slices():
+    # Short waits, so Ctrl-C is seen between them
+    notifier = _win_notifier([winreg_watch.WAIT_TIMEOUT] * 3 + [0])
+    assert notifier.wait() == {"Software\\Test"}
+    assert notifier._kernel32.waits == [250] * 4
+
+
+def test_win_notifier_timeout():
+    notifier = _win_notifier([winreg_watch.WAIT_TIMEOUT])
+    assert notifier.wait(0) == set()
+    assert notifier._kernel32.waits == [0]
+
+
+def test_win_notifier_wait_failed():
+    notifier = _win_notifier([winreg_watch.WAIT_FAILED])
+    with pytest.raises(OSError):
+        notifier.wait()
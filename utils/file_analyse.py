@@ -11,6 +11,13 @@ The command to start the console was:
 Alternatively to run the script:
     uv run python file_analyse.py
 
+Each section below makes its own pass over the data, which is fine for a
+looksee on the REPL. For the key counts, longest & deepest paths, duplicates,
+Types and Class Names of large exports in a single pass, see 'winreg_stats.py',
+which can also parse all of 'tuple_of_files' across processes:
+    uv run --with numpy python winreg_stats.py regdump_HKEY_CURRENT_USER.txt
+    uv run --with numpy python winreg_stats.py regdump_HKEY_*.txt --processes 5
+
 """
 
 # ###############################################################
@@ -92,14 +99,14 @@ print(f"\nDeepest key-path is {len(deepest_path)} characters.")
 print(f"With {len(deepest_path.split('\\'))} keys in it:\n")
 print(deepest_path)  # The actual key-path
 
-# There should be NO duplicate keys: false and []
-print(f"\nDuplicates = {keynames.count(keynames) > 1}")
+# There should be NO duplicate keys: False and []
 seen = set()
 duplicates = set()
 for num in keynames:
     if num in seen:
         duplicates.add(num)
     seen.add(num)
+print(f"\nDuplicates = {bool(duplicates)}")
 pprint(list(duplicates))
 
 # So Key Names are like a path, i.e. the path is made up of keys
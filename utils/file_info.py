@@ -43,7 +43,6 @@ table_list = []
 for index, filename in enumerate(tuple_of_files):
     with open(filename, encoding="utf-16") as fid:
         this_table_row = []
-        data = fid.readlines()
 
         this_table_row.append(filename)
 
@@ -62,14 +61,15 @@ for index, filename in enumerate(tuple_of_files):
             this_table_row.append(f"{file_size_kb:.2f} (KB)")
         else:
             this_table_row.append(f"{file_size_mb:.2f} (MB)")
-        this_table_row.append(len(data))
 
-        keynames = []
-        for this_line in data:
+        # Count lines and keys in one pass, without holding the file in memory
+        line_count = key_count = 0
+        for this_line in fid:
+            line_count += 1
             if this_line.startswith("Key Name:"):
-                # Caution: Keys can have whitespace
-                keynames.append(this_line.split("Key Name:")[1].strip())
-        this_table_row.append(len(keynames))
+                key_count += 1
+        this_table_row.append(line_count)
+        this_table_row.append(key_count)
 
     print(this_table_row)
     table_list.append(this_table_row)
@@ -79,7 +79,7 @@ for index, filename in enumerate(tuple_of_files):
 sorted_table = sorted(table_list, key=lambda x: x[2])  # Sort on line count
 for this_row in sorted_table:
     table.add_row(
-        str(this_row[0]), str(this_row[1]), str(this_row[2]), str(this_row[2])
+        str(this_row[0]), str(this_row[1]), str(this_row[2]), str(this_row[3])
     )
 
 console.print(table)
@@ -0,0 +1,108 @@
+r"""
+Registry 'du', which subtrees are the heaviest.
+
+Totals the keys, values and value data bytes of every subtree, in one pass
+over a stream of key records in pre-order, i.e. each key before the keys
+below it, as both 'winreg_read.walk_winreg_records()' and RegEdit text
+exports ('winreg_dump.iter_dump_records()') give them.
+
+Only the subtrees still open, the current key and its ancestors, are kept.
+Once the stream moves past a subtree its totals are added into its
+parent's, and it is offered to a heap of the top-N heaviest. So memory is
+bounded by the depth of the tree plus N, not the number of keys.
+
+Example, the 10 subtrees with the most keys two levels below the HKEY:
+
+    records = iter_dump_records(["regdump_HKEY_CLASSES_ROOT.txt"])
+    heaviest, total = heaviest_subtrees(records, depth=2, top=10, sort="keys")
+"""
+
+import heapq
+from typing import NamedTuple
+
+try:  # Imported as part of the package, e.g. by the tests
+    from .winreg_dump import value_size
+except ImportError:  # Imported by 'winreg_read.py' when it is run as a script
+    from winreg_dump import value_size
+
+SORT_BY = ("bytes", "keys", "values")
+
+
+class SubtreeSize(NamedTuple):
+    """Totals for a key and everything below it."""
+
+    path: str
+    keys: int
+    values: int
+    bytes: int
+
+
+def _close(stack):
+    """Pop the innermost open subtree, adding its totals to its parent's."""
+    path, _, depth, keys, values, size = stack.pop()
+    if stack:
+        parent = stack[-1]
+        parent[3] += keys
+        parent[4] += values
+        parent[5] += size
+    return depth, SubtreeSize(path, keys, values, size)
+
+
+def subtree_sizes(records):
+    """
+    Yield (depth, 'SubtreeSize') for each key of the pre-order records, in post-order.
+
+    depth is below the first record, or whichever record a key is not under.
+    """
+    # The open subtrees, as [path, casefold path prefix, depth, keys, values, bytes]
+    stack = []
+    for path, values, *_ in records:
+        folded = path.casefold()
+        while stack and not folded.startswith(stack[-1][1]):
+            yield _close(stack)
+        depth = stack[-1][2] + 1 if stack else 0
+        size = sum(value_size(value) for _, value, _ in values)
+        stack.append([path, f"{folded}\\", depth, 1, len(values), size])
+    while stack:
+        yield _close(stack)
+
+
+def heaviest_subtrees(records, depth=1, top=20, sort="bytes"):
+    """
+    Return ([heaviest 'SubtreeSize', ...], total 'SubtreeSize') of the records.
+
+    Args:
+        records:
+            Iterable of (path, values) or (path, values, class_name) key records,
+            in pre-order.
+
+        depth:
+            Only rank subtrees this far below the first record, e.g. 1 for
+            its subkeys, or None for subtrees at any depth.
+
+        top:
+            Number of subtrees to return, heaviest first.
+
+        sort:
+            What makes a subtree heavy, one of 'bytes', 'keys' or 'values'.
+
+    """
+    if sort not in SORT_BY:
+        raise ValueError(f"sort must be one of {SORT_BY}, not {sort!r}")  # noqa: TRY003, EM102
+
+    heap = []  # The top, lightest first, as (weight, -order, 'SubtreeSize')
+    keys = values = size = 0
+    for order, (this_depth, subtree) in enumerate(subtree_sizes(records)):
+        if this_depth == 0:
+            keys += subtree.keys
+            values += subtree.values
+            size += subtree.bytes
+        if depth is None or this_depth == depth:
+            entry = (getattr(subtree, sort), -order, subtree)
+            if len(heap) < top:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heappushpop(heap, entry)
+
+    heaviest = [subtree for *_, subtree in sorted(heap, reverse=True)]
+    return heaviest, SubtreeSize("", keys, values, size)
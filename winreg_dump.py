@@ -0,0 +1,251 @@
+"""
+Read Windows 'RegEdit.exe' text exports as a stream of key records.
+
+RegEdit can export an HKEY as a text file ('Save as type: Text Files'),
+UTF-16 encoded, with a block per key:
+
+    Key Name:          HKEY_CURRENT_USER\\Software\\Python
+    Class Name:        <NO CLASS>
+    Last Write Time:   01/08/2025 - 10:15
+    Value 0
+      Name:            <NO NAME>
+      Type:            REG_SZ
+      Data:            Python Software Foundation
+
+The records are the same shape as a live walk of the registry gives,
+'KeyRecord(path, values, class_name)', so either can be fed to the
+same consumers, e.g. 'winreg_stats.RegStats'. Values are (name, data, type),
+but from a dump the data is the exported text and the type its name.
+
+Large dumps can be parsed across processes. Each file is split into chunks
+at key blocks, and 'map_dump_chunks()' calls a function on the records of
+each chunk in a pool of processes, e.g. to total them. Only its results,
+not the records, come back to the calling process, so that is not what
+limits the speed. 'iter_dump_records_parallel()' does return the records,
+in the same order as 'iter_dump_records()', but has to rebuild each one
+in the calling process, which limits the speed-up to a few times.
+"""
+
+import codecs
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+KEY_NAME = "Key Name:"
+CLASS_NAME = "Class Name:"
+VALUE_NAME = "  Name:"
+VALUE_TYPE = "  Type:"
+VALUE_DATA = "  Data:"
+
+NO_NAME = "<NO NAME>"  # '(Default)' value
+NO_CLASS = "<NO CLASS>"
+
+CHUNK_SIZE = 16 * 1024 * 1024  # Bytes of a dump file parsed by each process
+SCAN_SIZE = 1024 * 1024  # Bytes read at a time looking for a key block boundary
+
+
+class KeyRecord(NamedTuple):
+    r"""
+    A key and its values.
+
+    path is the full key-path, including the HKEY,
+    e.g. 'HKEY_CURRENT_USER\Software\Python'.
+    """
+
+    path: str
+    values: list
+    class_name: str | None = None
+
+
+def value_size(value):
+    """Approximate size in bytes of a value, as the registry stores it."""
+    if value is None:
+        return 0
+    if isinstance(value, bytes | bytearray):
+        return len(value)
+    if isinstance(value, str):
+        return (len(value) + 1) * 2  # UTF-16, null terminated
+    if isinstance(value, list):  # REG_MULTI_SZ
+        return sum((len(x) + 1) * 2 for x in value) + 2
+    if isinstance(value, int):
+        return 4 if -(2**31) <= value < 2**32 else 8  # REG_DWORD or REG_QWORD
+    return len(str(value))
+
+
+def parse_dump_lines(lines):
+    """Yield a 'KeyRecord' per key block in the lines of a RegEdit text export."""
+    path, values, class_name = None, [], None
+    name = type = data = None
+
+    def _end_value():
+        if name is not None:
+            values.append((name, data if data is not None else "", type))
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+
+        if line.startswith(KEY_NAME):
+            _end_value()
+            name = None
+            if path is not None:
+                yield KeyRecord(path, values, class_name)
+            # Caution: Keys can have whitespace
+            path, values, class_name = line[len(KEY_NAME) :].strip(), [], None
+        elif line.startswith(CLASS_NAME):
+            class_name = line[len(CLASS_NAME) :].strip()
+            if class_name == NO_CLASS:
+                class_name = None
+        elif line.startswith(VALUE_NAME):
+            _end_value()
+            name = line[len(VALUE_NAME) :].strip()
+            if name == NO_NAME:
+                name = ""
+            type = data = None
+        elif line.startswith(VALUE_TYPE):
+            type = line[len(VALUE_TYPE) :].strip()
+        elif line.startswith(VALUE_DATA):
+            data = line[len(VALUE_DATA) :].strip()
+        elif data is not None and line and not line.startswith("Value "):
+            data = f"{data}\n{line}" if data else line  # Binary data continues
+
+    _end_value()
+    if path is not None:
+        yield KeyRecord(path, values, class_name)
+
+
+def iter_dump_records(files, encoding="utf-16"):
+    """Yield a 'KeyRecord' per key in each RegEdit text export, one line at a time."""
+    for filename in files:
+        # 'UTF-16' to prevent UnicodeDecodeError, some 'locale' characters
+        # will not work for UTF-8
+        with open(filename, encoding=encoding) as fid:
+            yield from parse_dump_lines(fid)
+
+
+def _dump_encoding(fid):
+    """Return (codec, offset of the text) from the UTF-16 BOM of the dump file."""
+    bom = fid.read(2)
+    if bom == codecs.BOM_UTF16_BE:
+        return "utf-16-be", 2
+    if bom == codecs.BOM_UTF16_LE:
+        return "utf-16-le", 2
+    return "utf-16-le", 0  # No BOM, RegEdit exports are little-endian
+
+
+def split_dump(filename, chunk_size=CHUNK_SIZE):
+    """
+    Return (codec, [(start, end), ...]) byte ranges splitting the dump file.
+
+    Each range, other than the first, starts at a 'Key Name:' line, so can be
+    parsed on its own. Ranges are about chunk_size bytes, or more if a key
+    block is longer than that.
+    """
+    size = os.path.getsize(filename)
+    with open(filename, "rb") as fid:
+        codec, start = _dump_encoding(fid)
+        boundary = f"\n{KEY_NAME}".encode(codec)
+        newline = len("\n".encode(codec))
+
+        ranges = []
+        target = start + chunk_size
+        while target < size:
+            # Look for the next 'Key Name:' line, on a whole UTF-16 code unit
+            fid.seek(target)
+            base, scanned, found = target, b"", -1
+            while found < 0 and (data := fid.read(SCAN_SIZE)):
+                scanned += data
+                found = scanned.find(boundary)
+                while found >= 0 and (base + found) % 2:
+                    found = scanned.find(boundary, found + 1)
+                if found < 0:
+                    # Keep the tail, in case the boundary straddles two reads
+                    drop = max(0, len(scanned) - len(boundary))
+                    base, scanned = base + drop, scanned[drop:]
+            if found < 0:
+                break  # No more key blocks, the last range runs to the end
+            end = base + found + newline
+            ranges.append((start, end))
+            start, target = end, end + chunk_size
+        ranges.append((start, size))
+    return codec, ranges
+
+
+def _chunk_records(filename, codec, start, end):
+    """Yield a 'KeyRecord' per key in a byte range of the dump file."""
+    with open(filename, "rb") as fid:
+        fid.seek(start)
+        text = fid.read(end - start).decode(codec)
+    # Same newline handling as reading the file in text mode
+    yield from parse_dump_lines(io.StringIO(text, newline=None))
+
+
+def _map_chunk(function, chunk):
+    return function(_chunk_records(*chunk))
+
+
+def map_dump_chunks(function, files, processes=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield function(records) for each chunk of the RegEdit text exports, in order.
+
+    Args:
+        function:
+            Called with an iterable of the 'KeyRecord's of one chunk, in a
+            worker process, so a module level function. Its result is pickled
+            back, so is best kept small, e.g. totals rather than the records.
+
+        files:
+            The RegEdit text exports, each split into chunks at key blocks.
+
+        processes:
+            Size of the pool of processes (default: one per CPU). With 1,
+            the chunks are all done in this process, without a pool.
+
+        chunk_size:
+            Bytes of a dump file in each chunk, or more if a key block is.
+
+    Only a few chunks per process are in flight at once, so memory stays
+    bounded however big the files are.
+    """
+    chunks = (
+        (filename, codec, start, end)
+        for filename in files
+        for codec, ranges in [split_dump(filename, chunk_size)]
+        for start, end in ranges
+    )
+
+    processes = processes or os.cpu_count()
+    if processes == 1:
+        for chunk in chunks:
+            yield _map_chunk(function, chunk)
+        return
+
+    with ProcessPoolExecutor(processes) as executor:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(executor.submit(_map_chunk, function, chunk))
+            if len(in_flight) > 2 * processes:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def _record_batch(records):
+    # Plain tuples pickle smaller than 'KeyRecord's
+    return [tuple(record) for record in records]
+
+
+def iter_dump_records_parallel(files, processes=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield a 'KeyRecord' per key in each RegEdit text export, parsed across processes.
+
+    The same records, in the same order, as 'iter_dump_records()', see
+    'map_dump_chunks()' for the arguments. Every record is still pickled
+    back, and rebuilt, in this process, so when only totals are wanted
+    'map_dump_chunks()' with a function returning them is much faster,
+    e.g. 'winreg_stats.dump_stats()'.
+    """
+    for batch in map_dump_chunks(_record_batch, files, processes, chunk_size):
+        for record in batch:
+            yield KeyRecord(*record)
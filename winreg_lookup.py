@@ -0,0 +1,337 @@
+r"""
+Cached point lookups of registry values, for hot-path configuration reads.
+
+Reading a value the usual way, 'OpenKey()' from the HKEY then
+'QueryValueEx()' (see 'utils/winreg_read_example.py'), opens the key again
+on every read. 'LookupClient' keeps two LRU caches instead:
+    Open key handles:
+        Up to max_handles keys, so a read that is not cached is one
+        'QueryValueEx()' on the open key.
+    Values:
+        Up to max_values (value, type) results, including values that do not
+        exist, so a cached read does not call the registry at all.
+
+Cached values are used for ttl seconds (forever if None), and then, if
+check_last_write, kept as long as their key's last write time (from
+'QueryInfoKey()') has not moved on. So with a ttl of None and
+check_last_write, every read is checked, but with one call per key for a
+whole 'get_many()' batch, which reads the values of each key together.
+
+Example:
+
+    client = LookupClient(winreg, ttl=5)
+    path = r"Software\Python\PythonCore\3.13\InstallPath"
+    value, type = client.get(winreg.HKEY_CURRENT_USER, path, "ExecutablePath")
+
+To compare with uncached reads, using a 'fake_winreg.FakeWinReg()':
+
+    uv run python winreg_lookup.py
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+MAX_HANDLES = 64  # Open key handles kept
+MAX_VALUES = 4096  # Values kept
+
+_MISSING = object()
+
+
+class LookupClient:
+    """
+    Registry value reads through LRU caches of key handles & values.
+
+    Args:
+        backend:
+            The 'winreg' module, or a 'fake_winreg.FakeWinReg()'.
+
+        max_handles, max_values:
+            Most key handles, and values, to keep. The least recently used
+            are dropped, and their key handles closed, first.
+
+        ttl:
+            Seconds a cached value is used for without checking it,
+            or None for no limit.
+
+        check_last_write:
+            Once the ttl is up, still use a cached value if its key's last
+            write time is unchanged. Otherwise the value is read again.
+
+        clock:
+            Time function, for testing.
+
+    Safe to share between threads. The caches and key handles are only used
+    holding a lock, so a handle is never closed by one thread while another
+    reads through it. That also means reads, including any registry calls
+    for them, are made one at a time.
+    """
+
+    def __init__(
+        self,
+        backend,
+        max_handles=MAX_HANDLES,
+        max_values=MAX_VALUES,
+        ttl=None,
+        check_last_write=True,
+        clock=time.monotonic,
+    ):
+        self._backend = backend
+        self.max_handles = max_handles
+        self.max_values = max_values
+        self.ttl = ttl
+        self.check_last_write = check_last_write
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        # (hkey, casefold key-path): open key handle
+        self._handles = OrderedDict()
+        # (hkey, casefold key-path, casefold name):
+        #     [(value, type) or None if missing, time checked, key's last write]
+        self._values = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.opens = 0  # Keys opened
+        self.checks = 0  # Last write times read
+
+    # ######################################
+    # Key handles
+
+    def _open(self, hkey, path):
+        handle_key = (hkey, path.casefold())
+        handle = self._handles.get(handle_key)
+        if handle is not None:
+            self._handles.move_to_end(handle_key)
+            return handle
+
+        handle = self._backend.OpenKey(hkey, path)
+        self.opens += 1
+        self._handles[handle_key] = handle
+        if len(self._handles) > self.max_handles:
+            _, oldest = self._handles.popitem(last=False)
+            oldest.Close()
+        return handle
+
+    def _call(self, hkey, path, function, *args):
+        """Call the winreg function on the key's handle, reopening a stale one once."""
+        try:
+            return function(self._open(hkey, path), *args)
+        except FileNotFoundError:
+            raise
+        except OSError:  # e.g. ERROR_KEY_DELETED, deleted since it was opened
+            handle = self._handles.pop((hkey, path.casefold()), None)
+            if handle is None:
+                raise
+            handle.Close()
+            return function(self._open(hkey, path), *args)
+
+    # ######################################
+    # Values
+
+    def _read_values(self, hkey, path, wanted):
+        """
+        Return [(index, (value, type) or None)] for the [(index, name)] of one key.
+
+        Stops at the first name that finds the key does not exist.
+        """
+        results = []
+        with self._lock:
+            try:
+                results.extend(self._iter_values(hkey, path, wanted))
+            except FileNotFoundError:  # No such key
+                pass
+        return results
+
+    def _iter_values(self, hkey, path, wanted):
+        folded = path.casefold()
+        now = self._clock()
+        last_write = None  # Read at most once, for all the names
+
+        def _last_write():
+            nonlocal last_write
+            if last_write is None:
+                last_write = self._call(hkey, path, self._backend.QueryInfoKey)[2]
+                self.checks += 1
+            return last_write
+
+        for index, name in wanted:
+            cache_key = (hkey, folded, name.casefold())
+            entry = self._values.get(cache_key)
+            if entry is not None:
+                found, checked, entry_write = entry
+                if self.ttl is not None and now - checked < self.ttl:
+                    valid = True
+                elif self.check_last_write:
+                    valid = entry_write == _last_write()
+                    entry[1] = now
+                else:
+                    valid = self.ttl is None
+                if valid:
+                    self.hits += 1
+                    self._values.move_to_end(cache_key)
+                    yield index, found
+                    continue
+
+            self.misses += 1
+            # The write time first, so a write racing the read is seen next time
+            entry_write = _last_write() if self.check_last_write else None
+            try:
+                found = self._call(hkey, path, self._backend.QueryValueEx, name)
+            except FileNotFoundError:
+                found = None
+            self._values[cache_key] = [found, now, entry_write]
+            self._values.move_to_end(cache_key)
+            if len(self._values) > self.max_values:
+                self._values.popitem(last=False)
+            yield index, found
+
+    def get(self, hkey, path, name, default=_MISSING):
+        """
+        Return (value, type) of the named value, like 'QueryValueEx()'.
+
+        If the key or value does not exist, default is returned if given,
+        otherwise FileNotFoundError is raised.
+        """
+        results = self._read_values(hkey, path, [(0, name)])
+        if results and results[0][1] is not None:
+            return results[0][1]
+        if default is _MISSING:
+            raise FileNotFoundError(2, "The system cannot find the file specified")  # noqa: TRY003
+        return default
+
+    def get_many(self, requests, default=None):
+        """
+        Return [(value, type), ...] for the (hkey, key-path, name) requests.
+
+        Requests are grouped by key, so each key is opened, and its last
+        write time read, at most once. Any that do not exist are default.
+        """
+        results = [default] * len(requests)
+        by_key = {}
+        for index, (hkey, path, name) in enumerate(requests):
+            by_key.setdefault((hkey, path.casefold()), (hkey, path, []))[2].append(
+                (index, name)
+            )
+
+        for hkey, path, wanted in by_key.values():
+            for index, found in self._read_values(hkey, path, wanted):
+                if found is not None:
+                    results[index] = found
+        return results
+
+    def invalidate(self, hkey=None, path=None):
+        """Forget the cached values, of one key-path or all of them."""
+        with self._lock:
+            if hkey is None:
+                self._values.clear()
+                return
+            folded = path.casefold()
+            for cache_key in [x for x in self._values if x[:2] == (hkey, folded)]:
+                del self._values[cache_key]
+
+    def stats(self):
+        """Return a dict of the hit & miss counters."""
+        with self._lock:
+            reads = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / reads if reads else 0.0,
+                "opens": self.opens,
+                "checks": self.checks,
+                "handles": len(self._handles),
+                "values": len(self._values),
+            }
+
+    def close(self):
+        """Close the cached key handles, and forget the values."""
+        with self._lock:
+            for handle in self._handles.values():
+                handle.Close()
+            self._handles.clear()
+            self._values.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+def _uncached_get(backend, hkey, path, name):
+    with backend.OpenKey(hkey, path) as key:
+        return backend.QueryValueEx(key, name)
+
+
+def benchmark(reads=100_000, keys=100, names=5, **client_args):
+    """
+    Return {name: (seconds, registry calls)} for the same reads, uncached & cached.
+
+    Reads are spread across the values of keys in a 'fake_winreg.FakeWinReg()'.
+    """
+    try:  # Imported as part of the package, e.g. by the tests
+        from . import fake_winreg
+    except ImportError:  # Run as a script, e.g. 'uv run python winreg_lookup.py'
+        import fake_winreg
+
+    fake = fake_winreg.FakeWinReg()
+    hkey = fake.HKEY_CURRENT_USER
+    for key in range(keys):
+        for name in range(names):
+            path = f"Software\\Company\\Product\\Key{key}"
+            fake.set_value(hkey, path, f"Name{name}", f"{key}.{name}")
+    requests = [  # Each key's values together, as a service might read them
+        (
+            hkey,
+            f"Software\\Company\\Product\\Key{x // names % keys}",
+            f"Name{x % names}",
+        )
+        for x in range(reads)
+    ]
+
+    calls = 0
+    for function in ("OpenKey", "QueryValueEx", "QueryInfoKey"):
+        original = getattr(fake, function)
+
+        def counted(*args, _original=original, **kwargs):
+            nonlocal calls
+            calls += 1
+            return _original(*args, **kwargs)
+
+        setattr(fake, function, counted)
+
+    def uncached():
+        for request in requests:
+            _uncached_get(fake, *request)
+
+    def cached():
+        client = LookupClient(fake, **client_args)
+        for request in requests:
+            client.get(*request)
+
+    def cached_batches():
+        client = LookupClient(fake, **client_args)
+        for start in range(0, reads, names):
+            client.get_many(requests[start : start + names])
+
+    results = {}
+    for label, run in [
+        ("uncached", uncached),
+        ("get", cached),
+        ("get_many", cached_batches),
+    ]:
+        calls, started = 0, time.perf_counter()
+        run()
+        results[label] = (time.perf_counter() - started, calls)
+    return results
+
+
+if __name__ == "__main__":
+    for client_args in [{}, {"ttl": 1.0}]:
+        print(
+            f"\nLookupClient({', '.join(f'{x}={y}' for x, y in client_args.items())})"
+        )
+        for label, (seconds, calls) in benchmark(**client_args).items():
+            print(f"{label:<10} {seconds:8.3f} sec {calls:>10,} registry calls")
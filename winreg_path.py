@@ -0,0 +1,99 @@
+r"""
+Key-paths as chains of segments, rather than full key-path strings.
+
+A traversal used to build a new full key-path string for every key, and
+then upper-case it to check against the exclusions, each O(depth). Instead
+a 'KeyPath' is the key's own name plus a pointer to its parent's
+'KeyPath', with the key name interned and its case-folded form cached.
+The full key-path string is only rendered when it is needed, e.g. to
+print, and then from the parent's already rendered string.
+
+Exclusions are held as a trie of case-folded segments, see
+'build_path_trie()', so checking a key is one dict lookup from its parent's
+trie node.
+
+Key names keep the casing 'EnumKey()' returned them with.
+"""
+
+import sys
+
+_END = None  # Trie entry marking a complete key-path
+
+
+class KeyPath:
+    """A key's name, and a pointer to its parent's 'KeyPath'."""
+
+    __slots__ = ("_text", "depth", "folded", "name", "parent")
+
+    def __init__(self, name, parent=None):
+        self.name = sys.intern(name)
+        self.folded = sys.intern(name.casefold())
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self._text = None
+
+    @classmethod
+    def from_string(cls, path):
+        r"""Return the 'KeyPath' for a key-path string, e.g. r'Software\Python'."""
+        segments = [segment for segment in path.split("\\") if segment]
+        if not segments:
+            return cls("")
+        node = cls(segments[0])
+        for segment in segments[1:]:
+            node = cls(segment, node)
+        return node
+
+    def child(self, name):
+        """Return the 'KeyPath' of the named subkey."""
+        return KeyPath(name, self)
+
+    def segments(self):
+        """Return the key names, from the top down."""
+        names = []
+        node = self
+        while node is not None:
+            if node.name:  # The '' root of a whole HKEY is not a segment
+                names.append(node.name)
+            node = node.parent
+        return names[::-1]
+
+    def __str__(self):
+        if self._text is None:
+            parent = str(self.parent) if self.parent is not None else ""
+            self._text = f"{parent}\\{self.name}" if parent else self.name
+        return self._text
+
+    def __repr__(self):
+        return f"KeyPath({str(self)!r})"
+
+
+def build_path_trie(paths):
+    """Return a trie, of nested dicts of case-folded segments, of the key-paths."""
+    trie = {}
+    for path in paths:
+        node = trie
+        for segment in path.split("\\"):
+            if segment:
+                node = node.setdefault(segment.casefold(), {})
+        node[_END] = True
+    return trie
+
+
+def trie_child(trie_node, folded):
+    """Return the trie node below trie_node for the case-folded segment, or None."""
+    if trie_node is None:
+        return None
+    return trie_node.get(folded)
+
+
+def trie_find(trie, key_path):
+    """Return the trie node for the 'KeyPath', or None if nothing is below it."""
+    node = trie
+    for segment in key_path.segments():
+        node = trie_child(node, segment.casefold())
+    return node
+
+
+def trie_has_end(trie_node):
+    """True if the trie node is the end of one of the key-paths."""
+    return trie_node is not None and _END in trie_node
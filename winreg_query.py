@@ -0,0 +1,169 @@
+r"""
+Query the Windows Registry with wildcard key-path expressions.
+
+Rather than traversing a whole subtree and filtering what is printed, only
+the keys the expression can match are opened. Runs of literal segments are
+opened directly, in one 'OpenKey()', and subkeys are only enumerated where
+there is a wildcard. So the work is proportional to the matched branches,
+not the size of the subtree.
+
+An expression is a key-path whose segments can be:
+    Literal:
+        A key name, matched case-insensitively, e.g. 'Software'.
+    Wildcard:
+        '*' for any one key, or a pattern such as 'Python3*' or 'Python3?'
+        (see 'fnmatch'), again case-insensitive.
+    Recursive:
+        '**' for zero or more keys, at any depth. This has to enumerate
+        everything below it, so is best used late in the expression.
+    Value selector:
+        Only as the last segment, '@' followed by a value name or pattern,
+        e.g. '@ExecutablePath' or '@*'. A bare '@' is the '(Default)' value.
+        Without a selector, all values of the matched keys are returned.
+
+Example:
+    r'Software\Python\*\*\InstallPath\@ExecutablePath'
+
+Key names starting with '@' cannot be matched as the last segment, as they
+are taken as a value selector.
+"""
+
+from fnmatch import fnmatchcase
+
+WILDCARD_CHARS = "*?["
+
+
+def _parse_expression(expression):
+    """Return ([key segments], value selector or None) for the expression."""
+    segments = [segment for segment in expression.split("\\") if segment]
+    selector = None
+    if segments and segments[-1].startswith("@"):
+        selector = segments.pop()[1:]
+    return segments, selector
+
+
+def _is_wildcard(segment):
+    return any(char in segment for char in WILDCARD_CHARS)
+
+
+def _enum_subkeys(backend, hkey, path):
+    """Return the subkey names of the key-path, or [] if it cannot be read."""
+    subkeys = []
+    try:
+        with backend.OpenKey(hkey, path) as key:
+            index = 0
+            while True:
+                try:
+                    subkeys.append(backend.EnumKey(key, index))
+                except OSError:  # Expected when no more keys
+                    break
+                index += 1
+    except (FileNotFoundError, PermissionError):
+        pass
+    return subkeys
+
+
+def _key_exists(backend, hkey, path):
+    try:
+        with backend.OpenKey(hkey, path):
+            return True
+    except (FileNotFoundError, PermissionError):
+        return False
+
+
+def _join(path, segment):
+    return f"{path}\\{segment}" if path else segment
+
+
+def _match_keys(backend, hkey, path, segments, verified=True):
+    """
+    Yield the key-paths below path that match the remaining segments.
+
+    verified is whether path is known to exist, e.g. it was enumerated.
+    """
+    # Consume the run of literal segments without opening anything
+    index = 0
+    while index < len(segments) and not _is_wildcard(segments[index]):
+        path = _join(path, segments[index])
+        index += 1
+    segments = segments[index:]
+    if index:
+        verified = False  # Literal key names might not exist
+
+    if not segments:
+        if verified or _key_exists(backend, hkey, path):
+            yield path
+        return
+
+    segment, rest = segments[0], segments[1:]
+    if segment == "**":
+        # Zero keys, then one more key with '**' still in front of the rest
+        yield from _match_keys(backend, hkey, path, rest, verified)
+        for subkey in _enum_subkeys(backend, hkey, path):
+            yield from _match_keys(backend, hkey, _join(path, subkey), segments)
+        return
+
+    pattern = segment.casefold()
+    for subkey in _enum_subkeys(backend, hkey, path):
+        if fnmatchcase(subkey.casefold(), pattern):
+            yield from _match_keys(backend, hkey, _join(path, subkey), rest)
+
+
+def query_keys(root_hkey, expression, backend):
+    r"""
+    Yield each key-path matching the expression (any value selector is ignored).
+
+    Args:
+        root_hkey:
+            A valid 'HKEY_*' constant of the backend.
+
+        expression:
+            Key-path expression, e.g. r'Software\Python\*\*\InstallPath'.
+
+        backend:
+            The 'winreg' module, or a 'fake_winreg.FakeWinReg()'.
+
+    """
+    segments, _ = _parse_expression(expression)
+
+    seen = set()  # '**' can reach the same key more than one way, e.g. '**\**'
+    for path in _match_keys(backend, root_hkey, "", segments):
+        if path.casefold() not in seen:
+            seen.add(path.casefold())
+            yield path
+
+
+def query_winreg(root_hkey, expression, backend):
+    r"""
+    Yield (key-path, name, value, type) for each value matching the expression.
+
+    Arguments as for 'query_keys()'. The expression can end in a value
+    selector, e.g. r'Software\Python\*\*\InstallPath\@ExecutablePath',
+    otherwise every value of each matched key is yielded.
+    """
+    _, selector = _parse_expression(expression)
+    pattern = None if selector is None else selector.casefold()
+
+    for path in query_keys(root_hkey, expression, backend):
+        try:
+            with backend.OpenKey(root_hkey, path) as key:
+                if pattern is not None and not _is_wildcard(pattern):
+                    # A single named value, no need to enumerate them all
+                    try:
+                        value, type = backend.QueryValueEx(key, selector)
+                    except FileNotFoundError:
+                        continue
+                    yield path, selector, value, type
+                    continue
+
+                index = 0
+                while True:
+                    try:
+                        name, value, type = backend.EnumValue(key, index)
+                    except OSError:  # Expected when no more values
+                        break
+                    index += 1
+                    if pattern is None or fnmatchcase(name.casefold(), pattern):
+                        yield path, name, value, type
+        except (FileNotFoundError, PermissionError):  # Removed, or unreadable
+            continue
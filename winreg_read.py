@@ -1,10 +1,53 @@
 import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
 import winreg
+from datetime import timedelta
+
+try:  # Imported as part of the package, e.g. by the tests
+    from . import (
+        winreg_du,
+        winreg_query,
+        winreg_snapshot,
+        winreg_throttle,
+        winreg_views,
+        winreg_watch,
+    )
+    from .winreg_dump import KeyRecord
+    from .winreg_path import (
+        KeyPath,
+        build_path_trie,
+        trie_child,
+        trie_find,
+        trie_has_end,
+    )
+except ImportError:  # Run as a script, e.g. 'uv run python winreg_read.py'
+    import winreg_du
+    import winreg_query
+    import winreg_snapshot
+    import winreg_throttle
+    import winreg_views
+    import winreg_watch
+    from winreg_dump import KeyRecord
+    from winreg_path import (
+        KeyPath,
+        build_path_trie,
+        trie_child,
+        trie_find,
+        trie_has_end,
+    )
 
 MAX_PRINT_TYPE_COL_WIDTH = 17  # Some will be truncated
 MAX_PRINT_NAME_COL_WIDTH = 24  # Some are >>100 chars
 MAX_PRINT_VALUE_COL_WIDTH = None  # Not used, no Limit imposed
 
+CHECKPOINT_INTERVAL = 1000  # Keys walked between checkpoint saves
+PROGRESS_INTERVAL = 5  # Seconds between progress reports
+
 REG_TYPE_DICT = {  # https://docs.python.org/3/library/winreg.html#value-types
     # "REG_UNKNOWN" is used for Types other than these
     0: "REG_NONE",
@@ -53,6 +96,7 @@ def _parse_arguments():
         "key",
         metavar="HKey",
         type=str,
+        nargs="?",
         help="Enter HKey, e.g. 'HKEY_CURRENT_USER'",
     )
 
@@ -60,6 +104,7 @@ def _parse_arguments():
         "path",
         metavar="Key-Path",
         type=str,
+        nargs="?",
         help="Subkey-Path to traverse from, e.g. 'Software\\python'",
     )
 
@@ -73,18 +118,217 @@ def _parse_arguments():
                 """,
     )
 
-    return parser.parse_args()
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="File to write the values to, rather than the console.",
+    )
+
+    parser.add_argument(
+        "-c",
+        "--checkpoint",
+        help="File to periodically save the traversal position to.",
+    )
+
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=int,
+        default=CHECKPOINT_INTERVAL,
+        help=f"Keys walked between checkpoint saves (default {CHECKPOINT_INTERVAL}).",
+    )
+
+    parser.add_argument(
+        "-r",
+        "--resume",
+        metavar="CHECKPOINT",
+        help="""Resume an interrupted traversal from its checkpoint file.
+                HKey, Key-Path and exclusions are taken from the checkpoint.
+                """,
+    )
+
+    parser.add_argument(
+        "-p",
+        "--progress",
+        action="store_true",
+        help="Print keys/sec and an ETA to stderr while traversing.",
+    )
+
+    parser.add_argument(
+        "-q",
+        "--query",
+        action="store_true",
+        help="""Treat Key-Path as a query expression, printing only the matches.
+                Segments can be '*' (any one key), '**' (any depth), or a
+                pattern, e.g. 'Python3*', and the last can select values,
+                e.g. 'Software\\Python\\*\\*\\InstallPath\\@ExecutablePath'.
+                """,
+    )
+
+    parser.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help="Rather than printing the values, print changes to them as they happen.",
+    )
 
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=winreg_watch.DEBOUNCE,
+        help=f"""Seconds without a change before watched changes are printed
+                (default {winreg_watch.DEBOUNCE}).
+                """,
+    )
+
+    parser.add_argument(
+        "--du",
+        action="store_true",
+        help="""Rather than printing the values, print the heaviest subtrees,
+                by their total keys, values or value data bytes.
+                """,
+    )
+
+    parser.add_argument(
+        "--du-depth",
+        type=int,
+        default=1,
+        help="Levels below the Key-Path of the subtrees to rank (default 1).",
+    )
+
+    parser.add_argument(
+        "--du-top",
+        type=int,
+        default=20,
+        help="Number of the heaviest subtrees to print (default 20).",
+    )
+
+    parser.add_argument(
+        "--du-sort",
+        choices=winreg_du.SORT_BY,
+        default="bytes",
+        help="What makes a subtree heavy (default bytes).",
+    )
+
+    parser.add_argument(
+        "--view",
+        choices=[*winreg_views.VIEWS, "both"],
+        help="""WOW64 registry view to walk, rather than the one Python has.
+                'both' walks the 64-bit view, other than its Wow6432Node keys,
+                then the 32-bit view, each key once.
+                """,
+    )
+
+    parser.add_argument(
+        "--unique",
+        action="store_true",
+        help="""Walk each key once, skipping keys reached again another way,
+                e.g. through a link such as SYSTEM\\CurrentControlSet.
+                """,
+    )
+
+    parser.add_argument(
+        "--snapshot",
+        metavar="STORE",
+        help="""Rather than printing the values, save them as a snapshot in
+                this directory, which can be shared by many computers.
+                Only keys & values not already in it take up space.
+                """,
+    )
 
-def get_keys(hkey, path):
-    """Yield all subkey names under the given HKey and sub-key path."""
+    parser.add_argument(
+        "--snapshot-name",
+        default=platform.node(),
+        help="Name to save the snapshot as (default the computer's name).",
+    )
+
+    parser.add_argument(
+        "--diff",
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="Print the changes between two snapshots in the --snapshot STORE.",
+    )
+
+    parser.add_argument(
+        "--max-ops-per-sec",
+        type=float,
+        help="""Throttle the walk to at most this many registry calls a second,
+                backing off further if the registry slows down.
+                """,
+    )
+
+    parser.add_argument(
+        "--cpu-budget",
+        type=float,
+        help="""Throttle the walk to at most this fraction of one CPU,
+                e.g. 0.1, backing off further if the registry slows down.
+                """,
+    )
+
+    parser.add_argument(
+        "--low-priority",
+        action="store_true",
+        help="Run at a low CPU (and on Windows I/O) scheduling priority.",
+    )
+
+    args = parser.parse_args()
+
+    if args.diff and not args.snapshot:
+        parser.error("--diff needs the --snapshot STORE")
+
+    if args.snapshot and (
+        args.watch or args.query or args.resume or args.checkpoint or args.du
+    ):
+        parser.error("--snapshot cannot be used with -w, -q, --resume, -c or --du")
+
+    if not (args.resume or args.diff) and (args.key is None or args.path is None):
+        parser.error("HKey and Key-Path are required, unless using --resume or --diff")
+
+    if args.checkpoint_interval < 1:
+        parser.error("--checkpoint-interval must be 1 or more")
+
+    if args.watch and (args.resume or args.checkpoint or args.progress):
+        parser.error("--watch cannot be used with --resume, -c or -p")
+
+    if args.query and (
+        args.watch or args.resume or args.checkpoint or args.progress or args.exclude
+    ):
+        parser.error("--query cannot be used with --watch, --resume, -c, -p or -e")
+
+    if args.du and (args.watch or args.query or args.resume or args.checkpoint):
+        parser.error("--du cannot be used with --watch, --query, --resume or -c")
+
+    if args.du_depth < 0 or args.du_top < 1:
+        parser.error("--du-depth must be 0 or more, and --du-top 1 or more")
+
+    if (args.unique or args.view == "both") and (
+        args.checkpoint or args.resume or args.watch or args.query
+    ):
+        parser.error(
+            "--unique and --view both cannot be used with -c, --resume, -w or -q"
+        )
+
+    if args.max_ops_per_sec is not None and args.max_ops_per_sec <= 0:
+        parser.error("--max-ops-per-sec must be more than 0")
+
+    if args.cpu_budget is not None and not 0 < args.cpu_budget <= 1:
+        parser.error("--cpu-budget must be more than 0, and at most 1")
+
+    return args
+
+
+def get_keys(hkey, path, backend=winreg):
+    """
+    Yield all subkey names under the given HKey and sub-key path.
+
+    backend is the 'winreg' module, or a 'fake_winreg.FakeWinReg()'.
+    """
     try:
         # Explicitly close handles, otherwise risk of leaks for large traversals
-        with winreg.OpenKey(hkey, path) as key:
+        with backend.OpenKey(hkey, path) as key:
             index = 0
             while True:
                 try:
-                    yield winreg.EnumKey(key, index)
+                    yield backend.EnumKey(key, index)
                     index += 1
                 except OSError:  # Expected when no more keys to yield
                     break
@@ -96,15 +340,19 @@ def get_keys(hkey, path):
         print(f"{err}: Permission Error: you may need to run the script as Admin.")
 
 
-def get_values(hkey, path):
-    """Yield all (name, value, type) tuples for values under the given HKey and sub-key path."""
+def get_values(hkey, path, backend=winreg):
+    """
+    Yield all (name, value, type) tuples for values under the given HKey and sub-key path.
+
+    backend is the 'winreg' module, or a 'fake_winreg.FakeWinReg()'.
+    """
     try:
         # Explicitly close handles, otherwise risk of leaks for large traversals
-        with winreg.OpenKey(hkey, path) as key:
+        with backend.OpenKey(hkey, path) as key:
             index = 0
             while True:
                 try:
-                    yield winreg.EnumValue(key, index)
+                    yield backend.EnumValue(key, index)
                     index += 1
                 except OSError:  # Expected when no more values to yield
                     break
@@ -159,7 +407,186 @@ def _check_root_key(hkey):
     return hkey
 
 
-def traverse_winreg_for_values(root_hkey, subkey_path, exclude_keys):
+def _hkey_name(hkey, view):
+    """The HKEY's name, marked if it is the 32-bit view of it."""
+    name = HKEY_CONST_DICT[hkey]
+    return f"{name} (32-bit)" if view == "32" else name
+
+
+def _first_visit(hkey, path, backend, visited):
+    """
+    True if the key is not in visited, adding it.
+
+    visited is a set of key identities, see 'winreg_views.key_identity()'.
+    """
+    try:
+        with backend.OpenKey(hkey, path) as key:
+            identity = winreg_views.key_identity(backend, key)
+    except (FileNotFoundError, PermissionError):
+        return True  # Left for reading its values & subkeys to report
+    if identity in visited:
+        return False
+    visited.add(identity)
+    return True
+
+
+def walk_winreg_records(
+    root_hkey,
+    subkey_path,
+    exclude_keys=None,
+    backend=winreg,
+    view=None,
+    visited=None,
+    skip_wow64_node=False,
+):
+    r"""
+    Yield a 'KeyRecord' for each key under, and including, the HKEY and Subkey-Path.
+
+    The records are in the same depth-first order, and shape, as the key
+    blocks of a RegEdit text export (see 'winreg_dump'), so the same
+    consumers can be used on either, e.g. 'winreg_stats.RegStats'.
+    The record paths start with the HKEY name, e.g. 'HKEY_CURRENT_USER\Software'.
+
+    Args:
+        root_hkey, subkey_path, exclude_keys:
+            As for 'traverse_winreg_for_values()', but no exclusions if None.
+
+        backend:
+            The 'winreg' module, or a 'fake_winreg.FakeWinReg()'.
+
+        view, visited, skip_wow64_node:
+            As for 'traverse_winreg_for_values()'.
+
+    """
+    if view == "both":
+        visited = set() if visited is None else visited
+        for this_view in winreg_views.BOTH_VIEWS:
+            yield from walk_winreg_records(
+                root_hkey,
+                subkey_path,
+                exclude_keys,
+                backend,
+                this_view,
+                visited,
+                skip_wow64_node=this_view == "64",
+            )
+        return
+
+    root_hkey = _check_root_key(root_hkey)
+    hkey_name = _hkey_name(root_hkey, view)
+    exclude_keys = [] if exclude_keys is None else _check_exclude_keys(exclude_keys)
+    if view:
+        backend = winreg_views.ViewBackend(backend, view)
+
+    excludes = build_path_trie(exclude_keys)
+    root = KeyPath.from_string(subkey_path)
+
+    pending = [(root, trie_find(excludes, root))]
+    while pending:
+        node, excluded = pending.pop()
+        path = str(node)
+        if visited is not None and not _first_visit(root_hkey, path, backend, visited):
+            continue
+        yield KeyRecord(
+            f"{hkey_name}\\{path}" if path else hkey_name,
+            list(get_values(root_hkey, path, backend)),
+        )
+
+        subkeys = list(get_keys(root_hkey, path, backend))
+        for subkey in reversed(subkeys):  # Popped in their enumerated order
+            if skip_wow64_node and winreg_views.is_wow64_node(subkey):
+                continue
+            child = node.child(subkey)
+            child_excluded = trie_child(excluded, child.folded)
+            if not trie_has_end(child_excluded):
+                pending.append((child, child_excluded))
+
+
+def load_checkpoint(checkpoint_file):
+    """Return the checkpoint dict saved by a previous, interrupted, traversal."""
+    with open(checkpoint_file, encoding="utf-8") as fid:
+        return json.load(fid)
+
+
+def _save_checkpoint(checkpoint_file, checkpoint):
+    """Write the checkpoint dict, replacing any previous one in a single step."""
+    # Write-then-rename, so an interruption never loses the last good checkpoint,
+    # synced first, so after a crash or reboot it is not renamed but empty
+    tmp_file = f"{checkpoint_file}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as fid:
+        json.dump(checkpoint, fid)
+        fid.flush()
+        os.fsync(fid.fileno())
+    os.replace(tmp_file, checkpoint_file)
+
+
+def _output_position():
+    """
+    Return (filename, offset) of stdout, if it is a file we can resume into.
+
+    The file is synced to disk first, so after a crash or reboot the offset
+    never points past what was actually written.
+    """
+    try:
+        sys.stdout.flush()
+        offset = sys.stdout.tell()
+    except (AttributeError, OSError, ValueError):  # Console, pipe, or mocked stdout
+        return None, None
+
+    name = getattr(sys.stdout, "name", None)
+    if not isinstance(name, str) or name.startswith("<"):  # e.g. '<stdout>' redirect
+        return None, offset
+    os.fsync(sys.stdout.fileno())
+    return name, offset
+
+
+def _print_progress(keys, started, done, start_keys=0, start_done=0.0):
+    """
+    Print keys/sec and ETA to stderr, so it does not mix with the printed values.
+
+    The rate and ETA only count the keys & done fraction since started,
+    i.e. start_keys & start_done are from any resumed checkpoint.
+    """
+    elapsed = time.monotonic() - started
+    rate = (keys - start_keys) / elapsed if elapsed else 0.0
+    if done < 1 and done > start_done:
+        eta = elapsed * (1 - done) / (done - start_done)
+        eta = str(timedelta(seconds=round(eta)))
+    else:
+        eta = "--:--:--"
+    print(
+        f"\r{keys} keys, {rate:.1f} keys/sec, {done:.1%} done, ETA {eta}  ",
+        end="",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def _check_exclude_keys(exclude_keys):
+    """Return the exclude_keys upper-cased, or [] with a warning if not a list."""
+    if isinstance(exclude_keys, list):
+        # FORCE to one format style for when we later use 'xxx in exclude_keys'
+        return [x.upper() for x in exclude_keys]
+
+    print(f"Exclude '{exclude_keys}' not valid, should be list(str)")
+    print("Ignoring and continuing with no exclusions.")
+    return []
+
+
+def traverse_winreg_for_values(
+    root_hkey,
+    subkey_path,
+    exclude_keys,
+    *,
+    checkpoint_file=None,
+    checkpoint_interval=CHECKPOINT_INTERVAL,
+    resume=None,
+    progress=False,
+    backend=winreg,
+    view=None,
+    visited=None,
+    skip_wow64_node=False,
+):
     r"""
     Get Windows Registry Values.
 
@@ -193,7 +620,57 @@ def traverse_winreg_for_values(root_hkey, subkey_path, exclude_keys):
                  "System\Currentcontrolset\ServiceState",
                  "HARDWARE\DESCRIPTION"]]
 
+        checkpoint_file:
+            Optional filename to periodically save the traversal frontier to.
+            Removed again once the traversal completes.
+
+        checkpoint_interval:
+            Number of keys walked between checkpoint saves, i.e. the most
+            work that will be repeated when resuming.
+
+        resume:
+            Optional checkpoint dict (see 'load_checkpoint()') to continue
+            an interrupted traversal from, rather than starting at subkey_path.
+
+        progress:
+            Print keys/sec and an ETA to stderr while traversing.
+
+        backend:
+            The 'winreg' module, or e.g. a 'winreg_throttle.ThrottledBackend()'.
+
+        view:
+            Optional WOW64 view to walk, '32' or '64', or 'both' to walk the
+            64-bit view, other than its Wow6432Node keys, then the 32-bit view,
+            each key once (see 'winreg_views'). Keys of the 32-bit view are
+            printed with 'HKEY_* (32-bit)', so with 'both' those not shared
+            by the two views. The default, None, is the view of the Python
+            running the script.
+
+        visited:
+            Optional set of the identities of keys already walked
+            (see 'winreg_views.key_identity()'). Keys in it are skipped,
+            e.g. ones reached again through a link, and the rest added.
+            Not saved in checkpoints, nor is the 'both' view walk.
+
+        skip_wow64_node:
+            Do not walk subkeys named 'Wow6432Node', e.g. as the 32-bit view
+            is walked as well. The key-path itself can still be one.
+
     """
+    if view == "both":
+        visited = set() if visited is None else visited
+        for this_view in winreg_views.BOTH_VIEWS:
+            traverse_winreg_for_values(
+                root_hkey,
+                subkey_path,
+                exclude_keys,
+                progress=progress,
+                backend=backend,
+                view=this_view,
+                visited=visited,
+                skip_wow64_node=this_view == "64",
+            )
+        return
 
     # ######################################
     # Internal function to get and print the
@@ -202,7 +679,7 @@ def traverse_winreg_for_values(root_hkey, subkey_path, exclude_keys):
     #   Type         Name         Value
     #
     def _print_values_for_path_key(root_hkey, path):
-        for name, value, type in get_values(root_hkey, path):
+        for name, value, type in get_values(root_hkey, path, backend):
             if not name:  # '(Default)' entries with a Value are not named
                 name = "(Default)"  # ...so name it
 
@@ -212,68 +689,356 @@ def traverse_winreg_for_values(root_hkey, subkey_path, exclude_keys):
                 f"{value}",
             )
 
+    # ######################################
+    # Internal function to save where we are,
+    # i.e. the key-paths still to walk and how
+    # much output has already been written
+    #
+    def _checkpoint():
+        output, output_offset = _output_position()
+        _save_checkpoint(
+            checkpoint_file,
+            {
+                "hkey": HKEY_CONST_DICT[root_hkey],
+                "path": str(root),
+                "exclude": exclude_keys,
+                "pending": [[str(node), weight] for node, weight, _ in pending],
+                "keys": keys,
+                "done": done,
+                "output": output,
+                "output_offset": output_offset,
+                "view": view,
+            },
+        )
+
     # ######################################
     # Check passed function arguments
     root_hkey = _check_root_key(root_hkey)
+    hkey_name = _hkey_name(root_hkey, view)
+    if view:
+        backend = winreg_views.ViewBackend(backend, view)
 
-    # Key-Path is case insensitive, but change it as close as we can
-    # to the Win Reg convention so when we print it, it looks pretty.
+    # Key-Path is case insensitive, it is printed as passed, with the subkeys
+    # below it printed as the registry has them.
     # No other checks for the key-path here. If it's wrong, a
     # FileNotFoundError exception will be raised when we try to access it.
-    path = subkey_path.title()
+    root = KeyPath.from_string(subkey_path)
 
-    if isinstance(exclude_keys, list):
-        # FORCE to one format style for when we later use 'xxx in exclude_keys'
-        exclude_keys = [x.upper() for x in exclude_keys]
-    else:
-        print(f"Exclude '{exclude_keys}' not valid, should be list(str)")
-        print("Ignoring and continuing with no exclusions.")
-        exclude_keys = []
+    exclude_keys = _check_exclude_keys(exclude_keys)
+    excludes = build_path_trie(exclude_keys)
 
     # ######################################
     # Main Functionality
-    print(f"\nComputer\\{HKEY_CONST_DICT[root_hkey]}\\{path}")
+    #
+    # Depth-first, using our own stack of [KeyPath, weight, exclusions] entries
+    # rather than recursion, so the frontier can be saved and later resumed.
+    # The weight is the fraction of the whole walk a key's subtree is estimated
+    # to be, split evenly between the key and its subkeys as they are found.
+    # The exclusions are the node of the exclusions trie for the key-path.
+    if resume:
+        keys, done = resume["keys"], resume["done"]
+        pending = []
+        for this_path, weight, *_ in resume["pending"]:  # Older ones had depth
+            node = KeyPath.from_string(this_path)
+            pending.append([node, weight, trie_find(excludes, node)])
+    else:
+        pending, keys, done = [[root, 1.0, trie_find(excludes, root)]], 0, 0.0
 
-    _print_values_for_path_key(root_hkey, path)
+    started = time.monotonic()
+    reported = started
+    start_keys, start_done = keys, done
 
-    # Iterate through any yielded subkeys on this input path
-    for subkey in get_keys(root_hkey, path):
-        # Update path, or handle no root-path case ("")
-        sub_path = f"{path}\\{subkey}" if path else subkey
+    while pending:
+        node, weight, excluded = pending.pop()
+        this_path = str(node)  # Rendered from the parent's, already rendered, path
 
-        if sub_path.upper() in exclude_keys:
-            print(f"\nUser Excluded: key-path={sub_path}")
+        if node is not root and trie_has_end(excluded):
+            print(f"\nUser Excluded: key-path={this_path}")
+            done += weight
             continue
 
-        print(f"\nComputer\\{HKEY_CONST_DICT[root_hkey]}\\{sub_path}")
+        if visited is not None and not _first_visit(
+            root_hkey, this_path, backend, visited
+        ):
+            print(f"\nAlready Walked: key-path={this_path}")
+            done += weight
+            continue
 
-        _print_values_for_path_key(root_hkey, sub_path)
+        print(f"\nComputer\\{hkey_name}\\{this_path}")
 
-        try:
-            # Recurse into any lower subkeys under the current subkey
-            for sub_subkey in get_keys(root_hkey, sub_path):
-                sub_subpath = f"{sub_path}\\{sub_subkey}"
-
-                if sub_subpath.upper() in exclude_keys:
-                    print(f"\nUser Excluded: key-path={sub_subpath}")
-                    continue
-
-                traverse_winreg_for_values(
-                    root_hkey,
-                    sub_subpath,
-                    exclude_keys,
-                )
+        _print_values_for_path_key(root_hkey, this_path)
+
+        # Read all subkeys now, so the key handle is closed before we descend
+        subkeys = list(get_keys(root_hkey, this_path, backend))
+        share = weight / (len(subkeys) + 1)
+        done += share
+
+        # Reversed, so subkeys pop off the stack in their enumerated order
+        for subkey in reversed(subkeys):
+            if skip_wow64_node and winreg_views.is_wow64_node(subkey):
+                done += share
+                continue
+            child = node.child(subkey)
+            pending.append([child, share, trie_child(excluded, child.folded)])
+
+        keys += 1
+        if checkpoint_file and keys % checkpoint_interval == 0:
+            _checkpoint()
+
+        if progress and time.monotonic() - reported >= PROGRESS_INTERVAL:
+            reported = time.monotonic()
+            _print_progress(keys, started, done, start_keys, start_done)
 
-        except RecursionError as err:  # This should not happen, but....
-            print(err)
+    if progress:
+        _print_progress(keys, started, 1.0, start_keys, start_done)
+        print(file=sys.stderr)
+
+    if checkpoint_file and os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)  # Finished, nothing to resume
+
+
+def print_winreg_changes(
+    root_hkey, subkey_path, exclude_keys, debounce=winreg_watch.DEBOUNCE, backend=winreg
+):
+    """
+    Print changes to the Values under the HKEY and Subkey-Path as they happen.
+
+    Runs until interrupted, e.g. Ctrl-C. Arguments are as for
+    'traverse_winreg_for_values()', with debounce the seconds without
+    a change before a burst of changes is printed.
+    """
+    root_hkey = _check_root_key(root_hkey)
+    hkey_name = HKEY_CONST_DICT[root_hkey]
+
+    print(f"\nWatching Computer\\{hkey_name}\\{subkey_path} (Ctrl-C to stop)")
+
+    for changes in winreg_watch.watch_winreg(
+        root_hkey,
+        [subkey_path],
+        backend,
+        exclude_keys=_check_exclude_keys(exclude_keys),
+        debounce=debounce,
+    ):
+        print(f"\n{time.strftime('%Y-%m-%d %H:%M:%S')}")
+        _print_changes(changes, f"Computer\\{hkey_name}\\")
+        sys.stdout.flush()  # Seen straight away, e.g. when printing to a file
+
+
+def _print_changes(changes, prefix):
+    """Print each 'winreg_watch.Change', with prefix before its key-path."""
+    for kind, path, name, old, new in changes:
+        print(f"\t{kind:<{MAX_PRINT_TYPE_COL_WIDTH}}", f"{prefix}{path}")
+        if name is not None:
+            name = name or "(Default)"  # '(Default)' entries are not named
+            old = "" if old is None else old[0]
+            new = "" if new is None else new[0]
+            print(f"\t{'':<{MAX_PRINT_TYPE_COL_WIDTH}}", f"{name}: {old} -> {new}")
+
+
+def print_winreg_snapshot(
+    root_hkey,
+    subkey_path,
+    exclude_keys,
+    store,
+    name,
+    backend=winreg,
+    view=None,
+    visited=None,
+):
+    """
+    Save the keys & values under the HKEY and Subkey-Path as a snapshot.
+
+    See 'winreg_snapshot'. Arguments are as for 'traverse_winreg_for_values()',
+    with store the 'winreg_snapshot.SnapshotStore' directory and name the
+    snapshot's name, e.g. the computer's name.
+    """
+    store = winreg_snapshot.SnapshotStore(store)
+    records = walk_winreg_records(
+        root_hkey,
+        subkey_path,
+        _check_exclude_keys(exclude_keys),
+        backend,
+        view,
+        visited,
+    )
+    manifest = store.save(name, records)
+    print(
+        f"\nSnapshot {name}: {manifest['keys']} keys, {manifest['values']} values,",
+        f"{store.written} new blobs",
+    )
+
+
+def print_snapshot_diff(store, old_name, new_name):
+    """Print the changes from the old to the new snapshot in the store."""
+    store = winreg_snapshot.SnapshotStore(store)
+    print(f"\nChanges from {old_name} to {new_name}")
+    _print_changes(store.diff(old_name, new_name), "Computer\\")
+
+
+def print_winreg_query(root_hkey, expression, backend=winreg):
+    r"""
+    Print the Values matching the query expression, see 'winreg_query'.
+
+    Args:
+        root_hkey:
+            As for 'traverse_winreg_for_values()'.
+
+        expression:
+            Key-path expression, e.g. r'Software\Python\*\*\InstallPath'.
+
+        backend:
+            The 'winreg' module, or a 'fake_winreg.FakeWinReg()'.
+
+    """
+    root_hkey = _check_root_key(root_hkey)
+
+    this_path = None
+    for path, name, value, type in winreg_query.query_winreg(
+        root_hkey, expression, backend
+    ):
+        if path != this_path:  # Values of a key are yielded together
+            this_path = path
+            print(f"\nComputer\\{HKEY_CONST_DICT[root_hkey]}\\{path}")
+
+        print(
+            f"\t{REG_TYPE_DICT.get(type, 'REG_UNKNOWN'):<{MAX_PRINT_TYPE_COL_WIDTH}}",
+            f"{name or '(Default)':<{MAX_PRINT_NAME_COL_WIDTH}}",
+            f"{value}",
+        )
+
+
+def print_winreg_du(
+    root_hkey,
+    subkey_path,
+    exclude_keys,
+    depth=1,
+    top=20,
+    sort="bytes",
+    backend=winreg,
+    view=None,
+    visited=None,
+):
+    """
+    Print the heaviest subtrees under the HKEY and Subkey-Path, see 'winreg_du'.
+
+    Arguments are as for 'traverse_winreg_for_values()', and
+    'winreg_du.heaviest_subtrees()' for depth, top and sort.
+    """
+    records = walk_winreg_records(
+        root_hkey,
+        subkey_path,
+        _check_exclude_keys(exclude_keys),
+        backend,
+        view,
+        visited,
+    )
+    heaviest, total = winreg_du.heaviest_subtrees(records, depth, top, sort)
+
+    print(f"\n{'Keys':>12} {'Values':>12} {'Bytes':>16}  Key-Path")
+    for path, keys, values, size in heaviest:
+        print(f"{keys:>12,} {values:>12,} {size:>16,}  Computer\\{path}")
+    print(f"{total.keys:>12,} {total.values:>12,} {total.bytes:>16,}  Total")
 
 
 def walk_winreg():
     """Script Main Function."""
     args = _parse_arguments()
 
-    # Error checking on passed args done in function
-    traverse_winreg_for_values(args.key, args.path, args.exclude)
+    if args.diff:
+        print_snapshot_diff(args.snapshot, *args.diff)
+        return
+
+    if args.low_priority:
+        winreg_throttle.set_low_priority()
+
+    backend = winreg
+    if args.max_ops_per_sec or args.cpu_budget:
+        backend = winreg_throttle.ThrottledBackend(
+            winreg, args.max_ops_per_sec, args.cpu_budget
+        )
+
+    if args.view in winreg_views.VIEWS and (args.query or args.watch):
+        backend = winreg_views.ViewBackend(backend, args.view)
+    visited = set() if args.unique else None
+
+    if args.resume:
+        # Carry on with the same arguments the interrupted walk was started with
+        resume = load_checkpoint(args.resume)
+        args.key, args.path, args.exclude = (
+            resume["hkey"],
+            resume["path"],
+            resume["exclude"],
+        )
+        args.checkpoint = args.checkpoint or args.resume
+        args.output = args.output or resume["output"]
+        args.view = resume.get("view")  # Not saved by older checkpoints
+    else:
+        resume = None
+
+    with contextlib.ExitStack() as stack:
+        if args.output:
+            if resume and resume["output_offset"] is not None:
+                # Drop anything written after the checkpoint, it will be redone
+                fid = stack.enter_context(open(args.output, "r+", encoding="utf-8"))
+                fid.seek(resume["output_offset"])
+                fid.truncate()
+            else:
+                fid = stack.enter_context(open(args.output, "w", encoding="utf-8"))
+            stack.enter_context(contextlib.redirect_stdout(fid))
+
+        if args.query:
+            print_winreg_query(args.key, args.path, backend)
+            return
+
+        if args.watch:
+            try:
+                print_winreg_changes(
+                    args.key, args.path, args.exclude, args.debounce, backend
+                )
+            except KeyboardInterrupt:
+                pass
+            return
+
+        if args.snapshot:
+            print_winreg_snapshot(
+                args.key,
+                args.path,
+                args.exclude,
+                args.snapshot,
+                args.snapshot_name,
+                backend,
+                args.view,
+                visited,
+            )
+            return
+
+        if args.du:
+            print_winreg_du(
+                args.key,
+                args.path,
+                args.exclude,
+                args.du_depth,
+                args.du_top,
+                args.du_sort,
+                backend,
+                args.view,
+                visited,
+            )
+            return
+
+        # Error checking on passed args done in function
+        traverse_winreg_for_values(
+            args.key,
+            args.path,
+            args.exclude,
+            checkpoint_file=args.checkpoint,
+            checkpoint_interval=args.checkpoint_interval,
+            resume=resume,
+            progress=args.progress,
+            backend=backend,
+            view=args.view,
+            visited=visited,
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,251 @@
+r"""
+Content-addressed store of registry snapshots, deduplicated across machines.
+
+A snapshot is built from a stream of key records in pre-order, e.g. a live
+'winreg_read.walk_winreg_records()' or RegEdit text exports
+('winreg_dump.iter_dump_records()'), Merkle-style:
+    Values blob:
+        A key's values, sorted by name, hashed.
+    Key blob:
+        The hash of the key's values blob, and the name and hash of each
+        subkey's key blob, sorted by name. So its hash covers the whole
+        subtree, but not the key's own name, which is in its parent's blob.
+    Manifest:
+        The key-path and key blob hash of each root of the records, saved
+        as 'snapshots/<name>.json'.
+
+Blobs are stored once, as 'objects/<hash[:2]>/<hash>', however many keys
+or snapshots have them. So when most machines have most subtrees the same,
+only the differences take up space. Comparing two snapshots only reads
+the blobs of subtrees whose hashes differ.
+
+Key & value names are compared case-insensitively, as the registry does.
+Class names are not stored. Snapshots are read back with their subkeys
+and values sorted by name, rather than in their original order.
+"""
+
+import hashlib
+import json
+import os
+import zlib
+
+try:  # Imported as part of the package, e.g. by the tests
+    from .winreg_dump import KeyRecord
+    from .winreg_watch import Change
+except ImportError:  # Imported by 'winreg_read.py' when it is run as a script
+    from winreg_dump import KeyRecord
+    from winreg_watch import Change
+
+DIGEST_SIZE = 16  # Bytes of BLAKE2b hash, as 32 hex characters
+
+
+def _encode_value(value):
+    """The value as JSON, with REG_BINARY bytes as {'hex': ...}."""
+    if isinstance(value, bytes | bytearray):
+        return {"hex": value.hex()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return bytes.fromhex(value["hex"])
+    return value
+
+
+def _name_key(entry):
+    return entry[0].casefold()
+
+
+def _join(path, name):
+    return f"{path}\\{name}" if path else name
+
+
+class SnapshotStore:
+    """
+    A directory of content-addressed blobs, and the snapshot manifests using them.
+
+    Args:
+        directory:
+            The store's directory, created if need be. Safe to share, e.g. on a
+            file server, as blobs are only ever added, each atomically.
+
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.written = 0  # Blobs written, i.e. not already in the store
+        self.read = 0  # Blobs read
+        self._known = set()  # Hashes known to be in the store
+        os.makedirs(os.path.join(directory, "snapshots"), exist_ok=True)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], digest)
+
+    def _manifest_path(self, name):
+        if not name or name in (".", "..") or any(x in name for x in "/\\:"):
+            raise ValueError(f"Not a valid snapshot name: {name!r}")  # noqa: TRY003, EM102
+        return os.path.join(self.directory, "snapshots", f"{name}.json")
+
+    def put(self, data):
+        """Store the blob, unless it already is, returning its hash."""
+        digest = hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+        if digest in self._known:
+            return digest
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            tmp_path = f"{blob_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as fid:
+                fid.write(zlib.compress(data))
+            os.replace(tmp_path, blob_path)  # Whole, or not at all
+            self.written += 1
+        self._known.add(digest)
+        return digest
+
+    def get(self, digest):
+        """Return the blob with the hash."""
+        with open(self._blob_path(digest), "rb") as fid:
+            data = zlib.decompress(fid.read())
+        self.read += 1
+        return data
+
+    def _put_json(self, obj):
+        # ASCII, as REG_SZ data can have unpaired surrogates, which UTF-8 cannot
+        return self.put(json.dumps(obj, separators=(",", ":")).encode("ascii"))
+
+    def _get_json(self, digest):
+        return json.loads(self.get(digest))
+
+    def save(self, name, records):
+        """
+        Store the records as the named snapshot, returning its manifest.
+
+        records is an iterable of (path, values) or (path, values, class_name)
+        key records, in pre-order. Replaces any snapshot of the same name.
+        """
+        roots, keys, values = [], 0, 0
+        # The open keys, as [path, casefold path prefix, values hash, [subkeys]]
+        stack = []
+
+        def _close():
+            path, _, values_digest, subkeys = stack.pop()
+            digest = self._put_json([values_digest, sorted(subkeys, key=_name_key)])
+            if stack:
+                # Relative to the parent, in case the records skip a level
+                stack[-1][3].append([path[len(stack[-1][0]) + 1 :], digest])
+            else:
+                roots.append([path, digest])
+
+        for path, key_values, *_ in records:
+            folded = path.casefold()
+            while stack and not folded.startswith(stack[-1][1]):
+                _close()
+            encoded = sorted(
+                (
+                    [name, _encode_value(value), type]
+                    for name, value, type in key_values
+                ),
+                key=_name_key,
+            )
+            stack.append([path, f"{folded}\\", self._put_json(encoded), []])
+            keys += 1
+            values += len(encoded)
+        while stack:
+            _close()
+
+        manifest = {"name": name, "roots": roots, "keys": keys, "values": values}
+        manifest_path = self._manifest_path(name)
+        with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as fid:
+            json.dump(manifest, fid, indent=1)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+        return manifest
+
+    def load(self, name):
+        """Return the named snapshot's manifest."""
+        with open(self._manifest_path(name), encoding="utf-8") as fid:
+            return json.load(fid)
+
+    def names(self):
+        """Return the names of the snapshots in the store."""
+        snapshots = os.path.join(self.directory, "snapshots")
+        return sorted(x[:-5] for x in os.listdir(snapshots) if x.endswith(".json"))
+
+    def records(self, name):
+        """Yield a 'KeyRecord' per key of the named snapshot, in pre-order."""
+        pending = [tuple(root) for root in reversed(self.load(name)["roots"])]
+        while pending:
+            path, digest = pending.pop()
+            values_digest, subkeys = self._get_json(digest)
+            yield KeyRecord(
+                path,
+                [
+                    (value_name, _decode_value(value), type)
+                    for value_name, value, type in self._get_json(values_digest)
+                ],
+            )
+            pending.extend((_join(path, x), y) for x, y in reversed(subkeys))
+
+    def _diff_values(self, path, old_digest, new_digest):
+        old = {x[0].casefold(): x for x in self._get_json(old_digest)}
+        new = {x[0].casefold(): x for x in self._get_json(new_digest)}
+        for folded, (name, value, type) in new.items():
+            if folded not in old:
+                yield Change(
+                    "value_added", path, name, None, (_decode_value(value), type)
+                )
+            elif old[folded][1:] != [value, type]:
+                _, old_value, old_type = old[folded]
+                yield Change(
+                    "value_changed",
+                    path,
+                    name,
+                    (_decode_value(old_value), old_type),
+                    (_decode_value(value), type),
+                )
+        for folded, (name, value, type) in old.items():
+            if folded not in new:
+                yield Change(
+                    "value_removed", path, name, (_decode_value(value), type), None
+                )
+
+    def diff(self, old_name, new_name):
+        """
+        Yield a 'winreg_watch.Change' per difference from the old to the new snapshot.
+
+        Added or removed keys are only reported at the top of their subtree.
+        """
+        old_roots = {x.casefold(): (x, y) for x, y in self.load(old_name)["roots"]}
+        new_roots = {x.casefold(): (x, y) for x, y in self.load(new_name)["roots"]}
+
+        pending = []  # (key-path, old key hash, new key hash)
+        for folded in sorted(old_roots.keys() | new_roots.keys()):
+            if folded not in new_roots:
+                yield Change("key_removed", old_roots[folded][0])
+            elif folded not in old_roots:
+                yield Change("key_added", new_roots[folded][0])
+            else:
+                path, digest = new_roots[folded]
+                pending.append((path, old_roots[folded][1], digest))
+        pending.reverse()  # Popped in name order
+
+        while pending:
+            path, old_digest, new_digest = pending.pop()
+            if old_digest == new_digest:
+                continue  # The same subtree, nothing below can differ
+            old_values, old_subkeys = self._get_json(old_digest)
+            new_values, new_subkeys = self._get_json(new_digest)
+            if old_values != new_values:
+                yield from self._diff_values(path, old_values, new_values)
+
+            old = {x.casefold(): (x, y) for x, y in old_subkeys}
+            new = {x.casefold(): (x, y) for x, y in new_subkeys}
+            children = []
+            for folded in sorted(old.keys() | new.keys()):
+                if folded not in new:
+                    yield Change("key_removed", _join(path, old[folded][0]))
+                elif folded not in old:
+                    yield Change("key_added", _join(path, new[folded][0]))
+                else:
+                    name, digest = new[folded]
+                    children.append((_join(path, name), old[folded][1], digest))
+            pending.extend(reversed(children))  # Popped in name order
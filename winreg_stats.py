@@ -0,0 +1,267 @@
+"""
+Single-pass statistics over a stream of registry key records.
+
+Works on any iterable of (path, values) or (path, values, class_name)
+records, e.g. a live walk ('winreg_read.walk_winreg_records()') or
+RegEdit text exports ('winreg_dump.iter_dump_records()'), reading each
+record once and keeping none of them.
+
+Uses NumPy, so the command line to run it on some exports is:
+
+    uv run --with numpy python winreg_stats.py regdump_HKEY_CURRENT_USER.txt
+
+or, for a machine's worth of exports, parsed across 8 processes:
+
+    uv run --with numpy python winreg_stats.py regdump_*.txt --processes 8
+
+The depth and value size histograms are fixed-size arrays. Duplicate keys
+are found from an 8 byte hash per key, kept in a sorted NumPy array, rather
+than a set of the key-paths themselves.
+
+Across processes, each chunk of the exports gets its own 'RegStats', and
+only those are sent back and merged, in order, not the records.
+"""
+
+import argparse
+import hashlib
+from collections import Counter
+from pprint import pprint
+
+import numpy as np  # pyright: ignore[reportMissingImports]
+
+try:  # Imported as part of the package, e.g. by the tests
+    from .winreg_dump import (
+        CHUNK_SIZE,
+        iter_dump_records,
+        map_dump_chunks,
+        value_size,
+    )
+except ImportError:  # Run as a script, e.g. 'uv run python winreg_stats.py'
+    from winreg_dump import (
+        CHUNK_SIZE,
+        iter_dump_records,
+        map_dump_chunks,
+        value_size,
+    )
+
+MAX_DEPTH = 512  # Registry limit on key-path depth
+SIZE_BINS = 64  # Value sizes in bytes, binned by bit length: 0, 1, 2-3, 4-7, ...
+BATCH_SIZE = 65536  # Keys/values buffered before adding to the histograms
+
+
+def _path_hash(path):
+    """8 byte hash of the key-path, which is case-insensitive."""
+    # Not Python's own hash, which is salted differently in each process
+    data = path.casefold().encode("utf-8", "surrogatepass")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def _in_sorted(sorted_array, values):
+    """Boolean array of which values are in the sorted array."""
+    if not len(sorted_array):
+        return np.zeros(len(values), dtype=bool)
+    found = np.minimum(np.searchsorted(sorted_array, values), len(sorted_array) - 1)
+    return sorted_array[found] == values
+
+
+def _insert_sorted(sorted_array, values):
+    """The sorted array with the (sorted, new) values merged in, without a re-sort."""
+    return np.insert(sorted_array, np.searchsorted(sorted_array, values), values)
+
+
+class RegStats:
+    """
+    Streaming aggregator of key-path and value statistics.
+
+    Feed records with 'add()' or 'update()', or 'merge()' the stats of
+    the records that follow, then read 'summary()'.
+
+    Args:
+        first_paths:
+            Keep the first key-path of each hash, which 'merge()' needs from
+            the stats being merged, to name keys duplicated across the two.
+
+    """
+
+    def __init__(self, first_paths=False):
+        self.keys = 0
+        self.values = 0
+        self.longest_path = ""
+        self.deepest_path = ""
+        self.deepest = -1
+        self.hkeys = Counter()
+        self.types = Counter()
+        self.class_names = Counter()
+        self.duplicates = []
+
+        self.depth_histogram = np.zeros(MAX_DEPTH + 1, dtype=np.int64)
+        self.size_histogram = np.zeros(SIZE_BINS + 1, dtype=np.int64)
+
+        # Sorted hashes of all key-paths seen so far
+        self._seen = np.empty(0, dtype=np.uint64)
+        # {hash: first key-path}, if kept
+        self._first_paths = {} if first_paths else None
+        # This batch, added to the arrays & histograms once BATCH_SIZE long
+        self._hashes = []
+        self._paths = []
+        self._depths = []
+        self._sizes = []
+
+    def add(self, path, values=(), class_name=None):
+        """Add one key record."""
+        depth = path.count("\\")
+        if len(path) > len(self.longest_path):
+            self.longest_path = path
+        if depth > self.deepest:
+            self.deepest, self.deepest_path = depth, path
+        self.hkeys[path.partition("\\")[0]] += 1
+        if class_name is not None:
+            self.class_names[class_name] += 1
+
+        self._hashes.append(_path_hash(path))
+        self._depths.append(depth)
+        self._paths.append(path)
+        self.keys += 1
+
+        for _, value, type in values:
+            self.types[type] += 1
+            self._sizes.append(value_size(value))
+        self.values += len(values)
+        if len(self._sizes) >= BATCH_SIZE:
+            self._flush_sizes()
+
+        if len(self._paths) == BATCH_SIZE:
+            self._flush_keys()
+
+    def update(self, records):
+        """Add every record from an iterable of records."""
+        for record in records:
+            self.add(*record)
+        return self
+
+    def _flush_sizes(self):
+        sizes = np.array(self._sizes, dtype=np.int64)
+        bins = np.zeros(sizes.shape, dtype=np.int64)
+        nonzero = sizes > 0
+        # Bit length, i.e. 1 for 1 byte, 2 for 2-3 bytes, 3 for 4-7 bytes...
+        bins[nonzero] = np.floor(np.log2(sizes[nonzero])).astype(np.int64) + 1
+        self.size_histogram += np.bincount(
+            np.minimum(bins, SIZE_BINS), minlength=SIZE_BINS + 1
+        )
+        self._sizes = []
+
+    def _flush_keys(self):
+        count = len(self._paths)
+        if not count:
+            return
+        hashes = np.array(self._hashes, dtype=np.uint64)
+        depths = np.minimum(np.array(self._depths, dtype=np.int64), MAX_DEPTH)
+        self.depth_histogram += np.bincount(depths, minlength=MAX_DEPTH + 1)
+
+        # Duplicates of keys from earlier batches...
+        earlier = _in_sorted(self._seen, hashes)
+        # ...and within this batch, after the first of each
+        unique, first = np.unique(hashes, return_index=True)
+        later = np.ones(count, dtype=bool)
+        later[first] = False
+        self.duplicates.extend(
+            self._paths[index] for index in np.flatnonzero(earlier | later)
+        )
+
+        new = ~earlier[first]
+        if self._first_paths is not None:
+            self._first_paths.update(
+                zip(unique[new].tolist(), (self._paths[x] for x in first[new]))
+            )
+        self._seen = _insert_sorted(self._seen, unique[new])
+        self._hashes, self._paths, self._depths = [], [], []
+
+    def merge(self, other):
+        """
+        Add the stats of another 'RegStats', of the records after this one's.
+
+        The other needs to have been made with first_paths. Its duplicates
+        are listed before the keys it duplicates from this one's records.
+        """
+        self._flush_keys()
+        self._flush_sizes()
+        other._flush_keys()
+        other._flush_sizes()
+
+        self.keys += other.keys
+        self.values += other.values
+        if len(other.longest_path) > len(self.longest_path):
+            self.longest_path = other.longest_path
+        if other.deepest > self.deepest:
+            self.deepest, self.deepest_path = other.deepest, other.deepest_path
+        self.hkeys.update(other.hkeys)
+        self.types.update(other.types)
+        self.class_names.update(other.class_names)
+        self.depth_histogram += other.depth_histogram
+        self.size_histogram += other.size_histogram
+
+        earlier = _in_sorted(self._seen, other._seen)
+        self.duplicates.extend(other.duplicates)
+        self.duplicates.extend(
+            other._first_paths[x] for x in other._seen[earlier].tolist()
+        )
+        new = other._seen[~earlier]
+        if self._first_paths is not None:
+            self._first_paths.update((x, other._first_paths[x]) for x in new.tolist())
+        self._seen = _insert_sorted(self._seen, new)
+        return self
+
+    def summary(self):
+        """Return a dict of the statistics for all records added so far."""
+        self._flush_keys()
+        self._flush_sizes()
+        return {
+            "keys": self.keys,
+            "values": self.values,
+            "longest_path": self.longest_path,
+            "deepest_path": self.deepest_path,
+            "duplicates": list(self.duplicates),
+            "hkeys": dict(self.hkeys),
+            "types": dict(self.types),
+            "class_names": self.class_names.most_common(),
+            "depth_histogram": np.trim_zeros(self.depth_histogram, "b").tolist(),
+            "size_histogram": np.trim_zeros(self.size_histogram, "b").tolist(),
+        }
+
+
+def _chunk_stats(records):
+    stats = RegStats(first_paths=True).update(records)
+    stats._flush_keys()  # The batches are not pickled, only the totals
+    stats._flush_sizes()
+    return stats
+
+
+def dump_stats(files, processes=None, chunk_size=CHUNK_SIZE):
+    """
+    Return the 'RegStats' of the RegEdit text exports, parsed across processes.
+
+    Arguments are as for 'winreg_dump.map_dump_chunks()'.
+    """
+    stats = RegStats()
+    for chunk_stats in map_dump_chunks(_chunk_stats, files, processes, chunk_size):
+        stats.merge(chunk_stats)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Statistics of RegEdit text exports, in a single pass",
+    )
+    parser.add_argument("files", nargs="+", help="RegEdit text export files.")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        help="Parse the exports across this many processes, rather than in this one.",
+    )
+    args = parser.parse_args()
+
+    if args.processes:
+        stats = dump_stats(args.files, args.processes)
+    else:
+        stats = RegStats().update(iter_dump_records(args.files))
+    pprint(stats.summary(), width=120)
@@ -0,0 +1,208 @@
+"""
+Throttle registry reads, so a walk does not compete with busy services.
+
+'ThrottledBackend' wraps a backend (the 'winreg' module, or a
+'fake_winreg.FakeWinReg()') and paces each 'winreg' function call:
+    max_ops_per_sec:
+        A token bucket, at most this many calls a second on average,
+        with bursts of up to a tenth of a second's worth.
+    cpu_budget:
+        At most this fraction of one CPU for the process, e.g. 0.1. After
+        each call, sleeps until the CPU time used is within the budget.
+    Adaptive backoff:
+        The average call latency is compared to the lowest seen so far. If
+        it rises to BACKOFF_FACTOR times that, the registry is taken to be
+        busy, and the calls are slowed down (halving the rate, and pausing
+        after each call for as long as the calls are taking), and sped back
+        up once the latency falls again.
+
+The wrapper has the same functions as the backend, so it can be passed
+anywhere a backend can, e.g. 'walk_winreg_records(..., backend=throttled)'.
+
+'set_low_priority()' lowers the process's scheduling priority, as well.
+"""
+
+import os
+import sys
+import time
+
+LATENCY_SMOOTHING = 0.1  # Weight of each call in the average latency
+BACKOFF_FACTOR = 2.0  # Average over the lowest latency by this to back off
+ADJUST_INTERVAL = 50  # Calls between checks of the latency
+MAX_SLOWDOWN = 64.0  # Most the calls are slowed down by when backing off
+CPU_WINDOW = 2.0  # Seconds the CPU budget is measured over
+
+LOW_PRIORITY_NICE = 10  # Added to the niceness, other than on Windows
+# https://learn.microsoft.com/en-us/windows/win32/api/processthreadsapi/nf-processthreadsapi-setpriorityclass
+IDLE_PRIORITY_CLASS = 0x40
+PROCESS_MODE_BACKGROUND_BEGIN = 0x00100000  # Low CPU, I/O and memory priority
+
+
+class TokenBucket:
+    """Allow rate calls a second on average, sleeping in 'take()' when over."""
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate / 10)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._last = clock()
+
+    def take(self):
+        """Take a token, sleeping until there is one. Return the seconds slept."""
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+        # In debt, the tokens accrued while sleeping pay it off on the next take
+        wait = -self._tokens / self.rate
+        self._sleep(wait)
+        return wait
+
+
+class ThrottledBackend:
+    """
+    A backend whose 'winreg' function calls are paced, see the module docstring.
+
+    Args:
+        backend:
+            The 'winreg' module, or a 'fake_winreg.FakeWinReg()'.
+
+        max_ops_per_sec:
+            Most calls a second, or None for no limit.
+
+        cpu_budget:
+            Most of one CPU the process can use, 0 to 1, or None for no limit.
+
+        backoff:
+            Slow down when the call latency rises.
+
+        clock, cpu_clock, sleep:
+            Wall time, process CPU time and sleep functions, for testing.
+
+    """
+
+    def __init__(
+        self,
+        backend,
+        max_ops_per_sec=None,
+        cpu_budget=None,
+        *,
+        backoff=True,
+        clock=time.monotonic,
+        cpu_clock=time.process_time,
+        sleep=time.sleep,
+    ):
+        self._backend = backend
+        self.max_ops_per_sec = max_ops_per_sec
+        self.cpu_budget = cpu_budget
+        self.backoff = backoff
+        self._clock = clock
+        self._cpu_clock = cpu_clock
+        self._sleep = sleep
+        self._bucket = (
+            TokenBucket(max_ops_per_sec, clock=clock, sleep=sleep)
+            if max_ops_per_sec
+            else None
+        )
+        self._window = (clock(), cpu_clock())
+
+        self.calls = 0
+        self.slept = 0.0  # Seconds spent throttled
+        self.latency = None  # Average seconds per call
+        self.lowest_latency = None
+        self.slowdown = 1.0  # Backoff, 1 when not backing off
+
+    def __getattr__(self, name):
+        # HKEY_* and other constants, 'CloseKey()' etc. as the backend has them
+        return getattr(self._backend, name)
+
+    def _call(self, function, *args, **kwargs):
+        if self._bucket:
+            self.slept += self._bucket.take()
+        started = self._clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self._after_call(self._clock() - started)
+
+    def _after_call(self, latency):
+        self.calls += 1
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += LATENCY_SMOOTHING * (latency - self.latency)
+
+        if self.backoff:
+            if self.calls % ADJUST_INTERVAL == 0:
+                self._adjust()
+            if self.slowdown > 1:
+                # Only use the registry 1/slowdown of the time
+                pause = (self.slowdown - 1) * latency
+                self._sleep(pause)
+                self.slept += pause
+
+        if self.cpu_budget:
+            self._check_cpu()
+
+    def _adjust(self):
+        """Back off while the latency is raised, otherwise speed back up."""
+        if self.lowest_latency is None or self.latency < self.lowest_latency:
+            self.lowest_latency = self.latency
+        if self.latency > BACKOFF_FACTOR * self.lowest_latency:
+            self.slowdown = min(MAX_SLOWDOWN, self.slowdown * 2)
+        else:
+            self.slowdown = max(1.0, self.slowdown * 0.8)
+        if self._bucket:
+            self._bucket.rate = self.max_ops_per_sec / self.slowdown
+
+    def _check_cpu(self):
+        """Sleep until the CPU used this window is within the budget."""
+        wall_start, cpu_start = self._window
+        wall = self._clock() - wall_start
+        ahead = (self._cpu_clock() - cpu_start) / self.cpu_budget - wall
+        if ahead > 0:
+            self._sleep(ahead)
+            self.slept += ahead
+        if wall + max(ahead, 0) >= CPU_WINDOW:
+            self._window = (self._clock(), self._cpu_clock())
+
+    # ######################################
+    # winreg functions
+
+    def OpenKey(self, *args, **kwargs):  # noqa: N802
+        return self._call(self._backend.OpenKey, *args, **kwargs)
+
+    def OpenKeyEx(self, *args, **kwargs):  # noqa: N802
+        return self._call(self._backend.OpenKeyEx, *args, **kwargs)
+
+    def EnumKey(self, key, index):  # noqa: N802
+        return self._call(self._backend.EnumKey, key, index)
+
+    def EnumValue(self, key, index):  # noqa: N802
+        return self._call(self._backend.EnumValue, key, index)
+
+    def QueryInfoKey(self, key):  # noqa: N802
+        return self._call(self._backend.QueryInfoKey, key)
+
+    def QueryValueEx(self, key, name):  # noqa: N802
+        return self._call(self._backend.QueryValueEx, key, name)
+
+
+def set_low_priority():
+    """Lower the process's scheduling priority, on Windows its I/O priority too."""
+    if sys.platform == "win32":
+        import ctypes  # 'WinDLL' is only usable on Windows
+        from ctypes import wintypes
+
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        kernel32.SetPriorityClass.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+        process = kernel32.GetCurrentProcess()
+        if not kernel32.SetPriorityClass(process, PROCESS_MODE_BACKGROUND_BEGIN):
+            kernel32.SetPriorityClass(process, IDLE_PRIORITY_CLASS)
+    else:
+        os.nice(LOW_PRIORITY_NICE)
@@ -0,0 +1,120 @@
+r"""
+WOW64 registry views, and walking each key only once.
+
+64-bit Windows keeps a separate 32-bit view of parts of the registry, e.g.
+HKLM\Software, which 32-bit programs see in place of the 64-bit keys. In the
+64-bit view the 32-bit keys are under 'Wow6432Node', e.g.
+HKLM\Software\Wow6432Node. 'ViewBackend' opens keys in a chosen view,
+whichever view the Python running the script has.
+
+The same key can be reached more than one way:
+    Symbolic links:
+        Keys with a 'SymbolicLinkValue' (REG_LINK) value, e.g.
+        HKLM\SYSTEM\CurrentControlSet is a link to a ControlSetNNN key.
+        Links can make cycles, so a walk that follows them never ends.
+    Shared keys:
+        Keys that are the same key in both views.
+    Wow6432Node:
+        The 32-bit view's keys, again, in the 64-bit view. There can be
+        more than one, e.g. HKLM\Software\Wow6432Node and
+        HKLM\Software\Classes\Wow6432Node.
+
+'key_identity()' returns the kernel's name of an open key, which is the
+same whichever way the key was reached. So a walk can keep a set of them,
+and skip the keys it has already walked, which also breaks link cycles.
+"""
+
+KEY_WOW64_64KEY = 0x0100
+KEY_WOW64_32KEY = 0x0200
+
+VIEWS = {"64": KEY_WOW64_64KEY, "32": KEY_WOW64_32KEY}
+# The 64-bit view without its Wow6432Node keys, then the 32-bit view, so the
+# 32-bit keys are reported as such, and the keys shared by both only once
+BOTH_VIEWS = ("64", "32")
+WOW64_NODE = "Wow6432Node"
+
+# https://learn.microsoft.com/en-us/windows-hardware/drivers/ddi/wdm/nf-wdm-zwquerykey
+KEY_NAME_INFORMATION = 3
+STATUS_BUFFER_OVERFLOW = 0x80000005
+STATUS_BUFFER_TOO_SMALL = 0xC0000023
+
+
+class ViewBackend:
+    """
+    A backend that opens keys in the 32-bit or 64-bit view.
+
+    Args:
+        backend:
+            The 'winreg' module, or a 'fake_winreg.FakeWinReg()'.
+
+        view:
+            '32' or '64'.
+
+    """
+
+    def __init__(self, backend, view):
+        self._backend = backend
+        self.view = view
+        self._access = VIEWS[view]
+
+    def __getattr__(self, name):
+        # HKEY_* and other constants, 'EnumKey()' etc. as the backend has them
+        return getattr(self._backend, name)
+
+    def OpenKey(self, key, sub_key, reserved=0, access=None):  # noqa: N802
+        access = self._backend.KEY_READ if access is None else access
+        return self._backend.OpenKey(key, sub_key, reserved, access | self._access)
+
+    def OpenKeyEx(self, key, sub_key, reserved=0, access=None):  # noqa: N802
+        access = self._backend.KEY_READ if access is None else access
+        return self._backend.OpenKeyEx(key, sub_key, reserved, access | self._access)
+
+
+def is_wow64_node(name):
+    """True if the subkey name is 'Wow6432Node', the 32-bit view's keys."""
+    return name.casefold() == WOW64_NODE.casefold()
+
+
+def _kernel_key_name(key):
+    r"""Return the kernel's name of the open key, e.g. '\REGISTRY\MACHINE\SOFTWARE'."""
+    import ctypes  # 'WinDLL' and 'wintypes' HANDLEs are only usable on Windows
+    from ctypes import wintypes
+
+    ntdll = ctypes.WinDLL("ntdll")
+    ntdll.NtQueryKey.restype = ctypes.c_long
+    ntdll.NtQueryKey.argtypes = [
+        wintypes.HANDLE,
+        ctypes.c_int,
+        ctypes.c_void_p,
+        wintypes.ULONG,
+        ctypes.POINTER(wintypes.ULONG),
+    ]
+
+    size = wintypes.ULONG(512)
+    while True:
+        buffer = ctypes.create_string_buffer(size.value)
+        status = ntdll.NtQueryKey(
+            int(key), KEY_NAME_INFORMATION, buffer, size, ctypes.byref(size)
+        )
+        status &= 0xFFFFFFFF
+        if status not in (STATUS_BUFFER_OVERFLOW, STATUS_BUFFER_TOO_SMALL):
+            break
+    if status:
+        raise OSError(ntdll.RtlNtStatusToDosError(status), "NtQueryKey failed")
+
+    # KEY_NAME_INFORMATION is a ULONG byte length, then the UTF-16 name
+    length = int.from_bytes(buffer.raw[:4], "little")
+    return buffer.raw[4 : 4 + length].decode("utf-16-le").casefold()
+
+
+def key_identity(backend, key):
+    """
+    Return a hashable identity of the open key, the same however it was reached.
+
+    That is the kernel's name of the key for the 'winreg' module (so Windows
+    only), or the backend's own 'key_identity()', e.g. a 'FakeWinReg()'.
+    """
+    identity = getattr(backend, "key_identity", None)
+    if identity is not None:
+        return identity(key)
+    return _kernel_key_name(key)
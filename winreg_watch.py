@@ -0,0 +1,354 @@
+"""
+Watch Windows Registry subtrees, yielding the changes made to them.
+
+Rather than re-reading the whole subtree every few minutes, a notification
+source says when, and roughly where, something changed. Only that part is
+re-read, and even then each key's values and subkeys are only re-enumerated
+if its last write time (from 'QueryInfoKey()') has moved on.
+
+A notification source is any object with:
+    wait(timeout=None):
+        Block until a change, or the timeout in seconds, returning the set of
+        changed key-paths (an empty set if it timed out).
+    close():
+        Stop watching.
+
+'WinRegNotifier' uses 'RegNotifyChangeKeyValue()' on Windows and reports
+the watched path whose subtree changed. 'fake_winreg.FakeNotifier' reports
+the exact changed key-paths of a 'fake_winreg.FakeWinReg' backend.
+
+Limitation: 'RegNotifyChangeKeyValue()' does not say which key in a
+watched subtree changed, so with 'WinRegNotifier' every change still costs
+one 'OpenKey()' and 'QueryInfoKey()' per key in the watched subtree, to find
+the keys whose write time moved. Only those keys are re-enumerated, but
+watching narrower key-paths keeps the per-change cost down.
+"""
+
+import time
+from typing import NamedTuple
+
+DEBOUNCE = 0.5  # Seconds without a change before the changes are read
+DEBOUNCE_MAX = 5.0  # Seconds to read changes after, even if they keep coming
+
+# https://learn.microsoft.com/en-us/windows/win32/api/winreg/nf-winreg-regnotifychangekeyvalue
+REG_NOTIFY_CHANGE_NAME = 0x1
+REG_NOTIFY_CHANGE_LAST_SET = 0x4
+WAIT_TIMEOUT = 0x102
+WAIT_FAILED = 0xFFFFFFFF
+# Ctrl-C cannot interrupt a blocked foreign call, so waits are this long at most
+WAIT_SLICE = 0.25
+
+
+class Change(NamedTuple):
+    """
+    A single change to a key-path.
+
+    kind is one of 'key_added', 'key_removed', 'value_added',
+    'value_removed' or 'value_changed'. For value changes, old and
+    new are the (value, type) before and after, otherwise None.
+    """
+
+    kind: str
+    path: str
+    name: str | None = None
+    old: tuple | None = None
+    new: tuple | None = None
+
+
+class WinRegNotifier:
+    """Notification source using 'RegNotifyChangeKeyValue()', Windows only."""
+
+    def __init__(self, backend, hkey, paths):
+        import ctypes  # 'windll' and 'wintypes' HANDLEs are only usable on Windows
+        from ctypes import wintypes
+
+        self._ctypes = ctypes
+        self._advapi32 = ctypes.WinDLL("advapi32")
+        self._kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        self._advapi32.RegNotifyChangeKeyValue.argtypes = [
+            wintypes.HANDLE,
+            wintypes.BOOL,
+            wintypes.DWORD,
+            wintypes.HANDLE,
+            wintypes.BOOL,
+        ]
+        self._kernel32.CreateEventW.restype = wintypes.HANDLE
+        self._kernel32.WaitForMultipleObjects.restype = wintypes.DWORD
+        self._kernel32.WaitForMultipleObjects.argtypes = [
+            wintypes.DWORD,
+            ctypes.POINTER(wintypes.HANDLE),
+            wintypes.BOOL,
+            wintypes.DWORD,
+        ]
+        self._kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        self._handle_type = wintypes.HANDLE
+
+        self._watches = []  # (path, key handle, event handle)
+        for path in paths:
+            key = backend.OpenKey(hkey, path, 0, backend.KEY_NOTIFY)
+            event = self._kernel32.CreateEventW(None, False, False, None)
+            self._watches.append((path, key, event))
+            self._arm(key, event)
+
+    def _arm(self, key, event):
+        # Notifications are one-shot, so this is repeated after each one
+        rc = self._advapi32.RegNotifyChangeKeyValue(
+            int(key),
+            True,  # Whole subtree
+            REG_NOTIFY_CHANGE_NAME | REG_NOTIFY_CHANGE_LAST_SET,
+            event,
+            True,  # Asynchronous, signal the event
+        )
+        if rc:
+            raise self._ctypes.WinError(rc)
+
+    def wait(self, timeout=None):
+        events = (self._handle_type * len(self._watches))(
+            *(event for _, _, event in self._watches)
+        )
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = WAIT_SLICE
+            if deadline is not None:
+                wait = max(0.0, min(wait, deadline - time.monotonic()))
+            index = self._kernel32.WaitForMultipleObjects(
+                len(self._watches), events, False, int(wait * 1000)
+            )
+            if index != WAIT_TIMEOUT:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+        if index == WAIT_FAILED or index >= len(self._watches):
+            raise self._ctypes.WinError(self._ctypes.get_last_error())
+
+        path, key, event = self._watches[index]
+        self._arm(key, event)
+        return {path}
+
+    def close(self):
+        for _, key, event in self._watches:
+            key.Close()
+            self._kernel32.CloseHandle(event)
+        self._watches = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+def _is_under(path, parent):
+    """True if the key-path is the parent, or below it (case-insensitive)."""
+    path, parent = path.casefold(), parent.casefold()
+    return not parent or path == parent or path.startswith(f"{parent}\\")
+
+
+def _coalesce(paths):
+    """Drop any key-paths that are below another, as those get re-read anyway."""
+    kept = []
+    for path in sorted(paths, key=lambda x: (x.count("\\"), x.casefold())):
+        if not any(_is_under(path, parent) for parent in kept):
+            kept.append(path)
+    return kept
+
+
+def _read_key(backend, hkey, path):
+    """Return (last write time, {name: (value, type)}, [subkeys]) for one key."""
+    with backend.OpenKey(hkey, path) as key:
+        last_write = backend.QueryInfoKey(key)[2]
+        values, subkeys = {}, []
+        index = 0
+        while True:
+            try:
+                name, value, type = backend.EnumValue(key, index)
+            except OSError:  # Expected when no more values
+                break
+            values[name] = (value, type)
+            index += 1
+        index = 0
+        while True:
+            try:
+                subkeys.append(backend.EnumKey(key, index))
+            except OSError:  # Expected when no more keys
+                break
+            index += 1
+    return last_write, values, subkeys
+
+
+def _forget(snapshot, path):
+    """Remove the key-path and everything below it from the snapshot."""
+    pending = [path]
+    while pending:
+        this_path = pending.pop()
+        entry = snapshot.pop(this_path.casefold(), None)
+        if entry:
+            pending.extend(f"{this_path}\\{subkey}" for subkey in entry[2])
+
+
+def _rescan(backend, hkey, path, snapshot, exclude_keys, changes):
+    """
+    Re-read the subtree at the key-path, updating the snapshot.
+
+    Appends a 'Change' for each difference to changes, if it is a list.
+    """
+    pending = [path]
+    while pending:
+        this_path = pending.pop()
+        if this_path.upper() in exclude_keys:
+            continue
+
+        old = snapshot.get(this_path.casefold())
+        try:
+            if old:
+                # Cheap check first, values & subkeys only change with the write time
+                with backend.OpenKey(hkey, this_path) as key:
+                    if backend.QueryInfoKey(key)[2] == old[0]:
+                        pending.extend(f"{this_path}\\{x}" for x in reversed(old[2]))
+                        continue
+            entry = _read_key(backend, hkey, this_path)
+        except (FileNotFoundError, PermissionError):  # Gone, or now unreadable
+            if old:
+                _forget(snapshot, this_path)
+                if changes is not None:
+                    changes.append(Change("key_removed", this_path))
+            continue
+
+        _, values, subkeys = entry
+        old_values, old_subkeys = (old[1], old[2]) if old else ({}, [])
+        snapshot[this_path.casefold()] = entry
+
+        if changes is not None:
+            if not old:
+                changes.append(Change("key_added", this_path))
+            for name, new in values.items():
+                if name not in old_values:
+                    changes.append(Change("value_added", this_path, name, None, new))
+                elif old_values[name] != new:
+                    changes.append(
+                        Change("value_changed", this_path, name, old_values[name], new)
+                    )
+            for name, old_value in old_values.items():
+                if name not in values:
+                    changes.append(
+                        Change("value_removed", this_path, name, old_value, None)
+                    )
+
+        for subkey in set(old_subkeys) - set(subkeys):
+            _forget(snapshot, f"{this_path}\\{subkey}")
+            if changes is not None:
+                changes.append(Change("key_removed", f"{this_path}\\{subkey}"))
+
+        pending.extend(f"{this_path}\\{subkey}" for subkey in reversed(subkeys))
+
+
+def _watch_changes(
+    backend,
+    root_hkey,
+    paths,
+    snapshot,
+    notifier,
+    exclude_keys,
+    debounce,
+    debounce_max,
+    timeout,
+):
+    """Yield a list of 'Change' per burst of changes, see 'watch_winreg()'."""
+    try:
+        while True:
+            changed = notifier.wait(timeout)
+            if not changed:  # Only when a timeout was given
+                return
+            started = time.monotonic()
+            while time.monotonic() - started < debounce_max:
+                more = notifier.wait(debounce)
+                if not more:
+                    break
+                changed |= more
+
+            changes = []
+            # A notification can be for a key's parent, e.g. a deleted key,
+            # so only rescan what is inside the watched paths
+            for path in _coalesce(changed):
+                for watched in paths:
+                    if _is_under(path, watched):
+                        _rescan(
+                            backend, root_hkey, path, snapshot, exclude_keys, changes
+                        )
+                        break
+                    if _is_under(watched, path):
+                        _rescan(
+                            backend, root_hkey, watched, snapshot, exclude_keys, changes
+                        )
+            if changes:
+                yield changes
+    finally:
+        notifier.close()
+
+
+def watch_winreg(
+    root_hkey,
+    paths,
+    backend,
+    notifier=None,
+    exclude_keys=None,
+    debounce=DEBOUNCE,
+    debounce_max=DEBOUNCE_MAX,
+    timeout=None,
+):
+    r"""
+    Watch the key-paths' subtrees, returning a generator of the changes to them.
+
+    The subtrees are read straight away, as the baseline that changes are
+    compared against. The returned generator then yields a list of 'Change'
+    per burst of changes.
+
+    Args:
+        root_hkey:
+            A valid 'HKEY_*' constant of the backend.
+
+        paths:
+            List of key-paths to watch, e.g. [r'Software\Python'].
+
+        backend:
+            The 'winreg' module, or a 'fake_winreg.FakeWinReg()'.
+
+        notifier:
+            Notification source, defaults to a 'WinRegNotifier' on the paths.
+
+        exclude_keys:
+            List of key-paths to ignore changes to.
+
+        debounce:
+            Changes are only read once none have arrived for this many seconds,
+            so a burst of changes is read, and yielded, once.
+
+        debounce_max:
+            ...unless the changes keep arriving for this many seconds.
+
+        timeout:
+            Stop watching if there are no changes for this many seconds.
+            The default, None, watches until the generator is closed.
+
+    """
+    exclude_keys = [x.upper() for x in exclude_keys or []]
+    if notifier is None:
+        notifier = WinRegNotifier(backend, root_hkey, paths)
+
+    # Snapshot of {casefold key-path: (last write time, values, subkeys)}
+    snapshot = {}
+    for path in paths:
+        _rescan(backend, root_hkey, path, snapshot, exclude_keys, None)
+
+    return _watch_changes(
+        backend,
+        root_hkey,
+        paths,
+        snapshot,
+        notifier,
+        exclude_keys,
+        debounce,
+        debounce_max,
+        timeout,
+    )